@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+
+"""
+deterministic synthetic workbook generator for benchmarks
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+# layout -> (rows, cols) at scale 1
+LAYOUTS: Dict[str, Tuple[int, int]] = {
+    "dense": (50, 8),
+    "sparse": (50, 8),
+    "many": (60, 40),
+    "nested": (40, 12),
+    "wide": (6, 400),
+    "tall": (2000, 4),
+}
+
+
+def _blank(rows: int, cols: int) -> np.ndarray:
+    return np.full((rows, cols), np.nan, dtype=object)
+
+
+def _table(
+    grid: np.ndarray,
+    r: int,
+    c: int,
+    rows: int,
+    cols: int,
+    rng: np.random.Generator,
+    prefix: str = "",
+    density: float = 1.0,
+):
+    """
+    write a table with a header row and a label column at r, c
+    """
+
+    body_r = slice(r + 1, r + rows)
+    body_c = slice(c + 1, c + cols)
+
+    grid[r, c] = f"{prefix}ID"
+    grid[r, body_c] = [f"{prefix}col{j}" for j in range(1, cols)]
+    grid[body_r, c] = [f"{prefix}row{i}" for i in range(1, rows)]
+
+    body = np.round(rng.random((rows - 1, cols - 1)) * 1000, 2).astype(object)
+
+    if density < 1.0:
+        body[rng.random(body.shape) > density] = np.nan
+
+    grid[body_r, body_c] = body
+
+
+def make_sheet(
+    layout: str = "dense",
+    scale: int = 1,
+    seed: int = 0,
+    rows: int = None,
+    cols: int = None,
+) -> pd.DataFrame:
+    """
+    generate a sheet as pd.read_excel(header=None) would return it
+
+    layouts are dense, sparse, many (small tables), nested, wide and tall ;
+    rows and cols default to the layout size multiplied by scale
+    """
+
+    if layout not in LAYOUTS:
+        raise ValueError(f"{layout} is not a recognized layout")
+
+    rng = np.random.default_rng(seed)
+    base_rows, base_cols = LAYOUTS[layout]
+
+    if layout in ("wide",):
+        rows, cols = rows or base_rows, cols or base_cols * scale
+    elif layout in ("tall",):
+        rows, cols = rows or base_rows * scale, cols or base_cols
+    else:
+        rows, cols = rows or base_rows * scale, cols or base_cols * scale
+
+    grid = _blank(rows + 2, cols + 2)
+
+    if layout == "many":
+        # 4x3 tables separated by one empty row and column
+        for r in range(1, rows - 3, 5):
+            for c in range(1, cols - 2, 4):
+                _table(grid, r, c, 4, 3, rng, prefix=f"t{r}_{c}_")
+
+    elif layout == "sparse":
+        _table(grid, 1, 1, rows, cols, rng, density=0.3)
+
+    elif layout == "nested":
+        _table(grid, 1, 1, rows, cols, rng)
+
+        # carve a gap in the body and place a smaller table in it
+        h, w = max(3, rows // 4), max(3, cols // 4)
+        r0, c0 = 1 + rows // 2, 1 + cols // 2
+        grid[slice(r0 - 1, r0 + h), slice(c0 - 1, c0 + w)] = np.nan
+        _table(grid, r0, c0, h, w, rng, prefix="sub")
+
+    else:
+        _table(grid, 1, 1, rows, cols, rng)
+
+    return pd.DataFrame(grid)
+
+
+def make_workbook(
+    layouts=tuple(LAYOUTS),
+    scale: int = 1,
+    seed: int = 0,
+) -> Dict[str, pd.DataFrame]:
+    """
+    generate one sheet per layout
+    """
+
+    return {
+        layout: make_sheet(layout, scale, seed + i) for i, layout in enumerate(layouts)
+    }
+
+
+def write_workbook(path, sheets: Dict[str, pd.DataFrame]):
+    """
+    write generated sheets to an xlsx file
+    """
+
+    with pd.ExcelWriter(path) as writer:
+        for name, df in sheets.items():
+            df.to_excel(writer, sheet_name=name, header=False, index=False)
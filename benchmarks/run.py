@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+
+"""
+eparse benchmark runner
+
+usage: python -m benchmarks.run --scale 4 --output results.json
+       python -m benchmarks.run --compare results.json
+"""
+
+import json
+import platform
+import sys
+from datetime import datetime, timezone
+from timeit import Timer
+from typing import Callable, Dict, List
+
+import click
+
+from eparse import __version__
+from eparse.core import (
+    _filter_nested_tables,
+    df_extract_tables,
+    df_find_tables,
+    df_parse_table,
+    df_serialize_table,
+    get_df_digest,
+    get_table_digest,
+)
+from eparse.interfaces import ExcelParse, i_factory
+
+from .generate import LAYOUTS, make_sheet
+
+
+class Case:
+    """
+    generated sheet with precomputed inputs for each benchmark
+    """
+
+    def __init__(self, layout: str, scale: int, seed: int = 0):
+        self.layout = layout
+        self.df = make_sheet(layout, scale, seed)
+        self.tables = df_find_tables(self.df, True)
+        self.parsed = [df_parse_table(self.df, r, c) for r, c, *_ in self.tables]
+        self.serialized = [
+            df_serialize_table(t, name=n, sheet=layout, f_name="bench.xlsx")
+            for t, (*_, n) in zip(self.parsed, self.tables)
+        ]
+
+
+def _sqlite_output(case: Case):
+    obj = i_factory("sqlite3:///", ExcelParse, memory=True)
+    for data in case.serialized:
+        obj.output(data)
+
+
+BENCHMARKS: Dict[str, Callable[[Case], object]] = {
+    "df_find_tables": lambda case: df_find_tables(case.df, True),
+    "_filter_nested_tables": lambda case: _filter_nested_tables(case.tables, case.df),
+    "df_parse_table": lambda case: [
+        df_parse_table(case.df, r, c) for r, c, *_ in case.tables
+    ],
+    "df_extract_tables": lambda case: [
+        v.to_df() for v in df_extract_tables(case.df, case.tables)
+    ],
+    "df_serialize_table": lambda case: [df_serialize_table(t) for t in case.parsed],
+    "get_table_digest": lambda case: [
+        get_table_digest(s, "bench") for s in case.serialized
+    ],
+    "get_df_digest": lambda case: [get_df_digest(t, "bench") for t in case.parsed],
+    "sqlite_output": _sqlite_output,
+}
+
+
+def run(
+    layouts=tuple(LAYOUTS),
+    benchmarks=tuple(BENCHMARKS),
+    scale: int = 1,
+    repeat: int = 3,
+    number: int = 1,
+) -> List[Dict]:
+    """
+    run benchmarks and return one result per (benchmark, layout)
+    """
+
+    results = []
+
+    for layout in layouts:
+        case = Case(layout, scale)
+
+        for name in benchmarks:
+            fcn = BENCHMARKS[name]
+            times = Timer(lambda: fcn(case)).repeat(repeat=repeat, number=number)
+            times = [t / number for t in times]
+
+            results.append(
+                {
+                    "benchmark": name,
+                    "layout": layout,
+                    "scale": scale,
+                    "shape": list(case.df.shape),
+                    "tables": len(case.tables),
+                    "best": min(times),
+                    "mean": sum(times) / len(times),
+                }
+            )
+
+    return results
+
+
+def compare(old: List[Dict], new: List[Dict], threshold: float = 1.1) -> List[str]:
+    """
+    return lines describing benchmarks that got slower than threshold
+    """
+
+    key = lambda r: (r["benchmark"], r["layout"], r["scale"])  # noqa: E731
+    previous = {key(r): r for r in old}
+    lines = []
+
+    for r in new:
+        p = previous.get(key(r))
+
+        if p is None or not p["best"]:
+            continue
+
+        ratio = r["best"] / p["best"]
+
+        if ratio > threshold:
+            lines.append(
+                f'{r["benchmark"]} {r["layout"]} x{r["scale"]} '
+                f'{p["best"]:.4f}s -> {r["best"]:.4f}s ({ratio:.2f}x)'
+            )
+
+    return lines
+
+
+@click.command()
+@click.option(
+    "--layout",
+    "-l",
+    type=click.Choice(list(LAYOUTS)),
+    multiple=True,
+    help="layout(s) to benchmark (default all)",
+)
+@click.option(
+    "--benchmark",
+    "-b",
+    type=click.Choice(list(BENCHMARKS)),
+    multiple=True,
+    help="benchmark(s) to run (default all)",
+)
+@click.option("--scale", "-s", type=int, default=1, help="size multiplier")
+@click.option("--repeat", "-r", type=int, default=3, help="timing repeats")
+@click.option(
+    "--output",
+    "-o",
+    type=str,
+    default=None,
+    help="write json results to this file",
+)
+@click.option(
+    "--compare",
+    "-c",
+    "previous",
+    type=str,
+    default=None,
+    help="report regressions against a previous json results file",
+)
+@click.option(
+    "--threshold",
+    type=float,
+    default=1.1,
+    help="slowdown ratio reported as a regression",
+)
+def main(layout, benchmark, scale, repeat, output, previous, threshold):
+    """
+    run eparse benchmarks
+    """
+
+    results = run(
+        layout or tuple(LAYOUTS),
+        benchmark or tuple(BENCHMARKS),
+        scale,
+        repeat,
+    )
+
+    report = {
+        "eparse": __version__,
+        "python": platform.python_version(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "results": results,
+    }
+
+    for r in results:
+        print(
+            f'{r["benchmark"]:<24}{r["layout"]:<8}{str(tuple(r["shape"])):<14}'
+            f'{r["best"]:.4f}s',
+            file=sys.stderr,
+        )
+
+    if output is not None:
+        with open(output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if previous is not None:
+        with open(previous) as f:
+            regressions = compare(json.load(f)["results"], results, threshold)
+
+        for line in regressions:
+            print(f"regression: {line}", file=sys.stderr)
+
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
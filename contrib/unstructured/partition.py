@@ -1,8 +1,20 @@
 """custom unstructured auto partition using eparse"""
 
-from typing import IO, Callable, Dict, List, Optional
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from io import BytesIO
+from typing import (
+    IO,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Union,
+)
 
-from unstructured.documents.elements import DataSourceMetadata
+from unstructured.documents.elements import DataSourceMetadata, Element
 from unstructured.file_utils.filetype import FileType, detect_filetype
 from unstructured.logger import logger
 from unstructured.partition.auto import file_and_type_from_url
@@ -10,6 +22,7 @@ from unstructured.partition.auto import partition as unstructured_partition_auto
 from unstructured.partition.common import exactly_one
 
 from eparse.contrib.unstructured.xlsx import partition_xlsx as eparse_partition_xlsx
+from eparse.worker import warm
 
 
 def partition(
@@ -107,9 +120,12 @@ def partition(
     fcn = unstructured_partition_auto
     is_xlsx = filetype in (FileType.XLS, FileType.XLSX)
 
-    if is_xlsx and eparse_mode not in (None, "unstructured"):
+    # unstructured's own partitioner would ignore eparse_chunk_rows
+    if is_xlsx and (
+        eparse_mode not in (None, "unstructured") or kwargs.get("eparse_chunk_rows")
+    ):
         fcn = eparse_partition_xlsx
-        kwargs["eparse_mode"] = eparse_mode
+        kwargs["eparse_mode"] = eparse_mode or "unstructured"
 
     if file is not None and file_filename is not None:
         kwargs.setdefault("metadata_filename", file_filename)
@@ -133,3 +149,81 @@ def partition(
         data_source_metadata=data_source_metadata,
         **kwargs,
     )
+
+
+class PartitionResult(NamedTuple):
+    """result of partitioning one file in a batch"""
+
+    index: int
+    source: str
+    elements: List[Element]
+    error: Optional[str] = None
+
+
+def _partition_one(
+    index: int, source: str, data: Optional[bytes], kwargs: Dict
+) -> PartitionResult:
+    try:
+        if data is None:
+            elements = partition(filename=source, **kwargs)
+        else:
+            elements = partition(file=BytesIO(data), file_filename=source, **kwargs)
+    except Exception as e:
+        return PartitionResult(index, source, [], f"{type(e).__name__}: {e}")
+
+    for element in elements:
+        if element.metadata.filename is None:
+            element.metadata.filename = source
+
+    return PartitionResult(index, source, elements)
+
+
+def partition_batch(
+    files: Iterable[Union[str, IO[bytes]]],
+    workers: int = 4,
+    max_pending: Optional[int] = None,
+    **kwargs,
+) -> Iterator[PartitionResult]:
+    """Partitions many documents in a pool of warm worker processes.
+
+    Results are yielded as soon as each file is done (not in input order), so
+    use PartitionResult.index or PartitionResult.source to match them to inputs.
+    A file that fails to partition yields a result with error set instead of
+    raising.
+
+    Parameters
+    ----------
+    files
+        Filenames and/or file-like objects using "rb" mode. File objects are read
+        in the calling process and sent to a worker as bytes.
+    workers
+        The number of worker processes.
+    max_pending
+        The maximum number of files submitted but not yet yielded, which bounds
+        memory use for file objects and unconsumed results. Defaults to 2 * workers.
+    kwargs
+        Passed to partition for every file, e.g. eparse_mode="table-digest".
+    """
+
+    max_pending = max_pending or 2 * workers
+    running = set()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=warm) as pool:
+        for index, f in enumerate(files):
+            if isinstance(f, str):
+                source, data = f, None
+            else:
+                source, data = getattr(f, "name", f"file-{index}"), f.read()
+
+            running.add(pool.submit(_partition_one, index, str(source), data, kwargs))
+
+            # stream finished files back while keeping at most max_pending in flight
+            while len(running) >= max_pending:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+        while running:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
@@ -1,7 +1,7 @@
 """custom unstructured xlsx partition module using eparse"""
 
 from tempfile import SpooledTemporaryFile
-from typing import IO, BinaryIO, List, Optional, Union, cast
+from typing import IO, BinaryIO, Iterator, List, Optional, Union, cast
 
 import lxml.html
 from unstructured.documents.elements import (
@@ -19,7 +19,7 @@ from unstructured.partition.common import (
     spooled_to_bytes_io_if_needed,
 )
 
-from eparse.core import df_serialize_table, get_df_from_file, get_table_digest
+from eparse.core import df_row_windows, get_df_digest, get_df_from_file
 
 _eparse_modes = (
     "eparse",
@@ -29,9 +29,7 @@ _eparse_modes = (
 )
 
 
-@process_metadata()
-@add_metadata_with_filetype(FileType.XLSX)
-def partition_xlsx(
+def iter_partition_xlsx(
     filename: Optional[str] = None,
     file: Optional[Union[IO[bytes], SpooledTemporaryFile]] = None,
     metadata_filename: Optional[str] = None,
@@ -39,21 +37,12 @@ def partition_xlsx(
     metadata_last_modified: Optional[str] = None,
     include_header: bool = True,
     **kwargs,
-) -> List[Element]:
-    """Partitions Microsoft Excel Documents in .xlsx format into its document elements.
+) -> Iterator[Element]:
+    """Lazily yields the elements of partition_xlsx one chunk at a time.
 
-    Parameters
-    ----------
-    filename
-        A string defining the target filename path.
-    file
-        A file-like object using "rb" mode --> open(filename, "rb").
-    include_metadata
-        Determines whether or not metadata is included in the output.
-    metadata_last_modified
-        The day of the last modification
-    include_header
-        Determines whether or not header info info is included in text and medatada.text_as_html
+    Tables are read, windowed and rendered to html/text only as elements are consumed,
+    so at most one chunk is held at a time. Takes the same parameters as partition_xlsx,
+    but skips its metadata decorators.
     """
     exactly_one(filename=filename, file=file)
     last_modification_date = None
@@ -68,59 +57,121 @@ def partition_xlsx(
         tables = get_df_from_file(f)
         last_modification_date = get_last_modified_date_from_file(file)
 
-    elements: List[Element] = []
     eparse_mode: Optional[str] = kwargs.pop("eparse_mode", None)
     eparse_max_rows: Optional[int] = kwargs.pop("eparse_max_rows", 75)
     eparse_max_cols: Optional[int] = kwargs.pop("eparse_max_cols", 20)
+    eparse_chunk_rows: Optional[int] = kwargs.pop("eparse_chunk_rows", None)
+    eparse_max_headers: Optional[int] = kwargs.pop("eparse_max_headers", None)
+    eparse_max_type_rows: Optional[int] = kwargs.pop("eparse_max_type_rows", None)
     table_number = 0
     for table, excel_RC, table_name, sheet_name in tables:
         table_number += 1
-        html_text = table.to_html(index=False, header=include_header, na_rep="")
 
-        if include_metadata:
-            datasource_metadata = DataSourceMetadata(
-                record_locator={
+        for chunk_number, chunk in enumerate(df_row_windows(table, eparse_chunk_rows)):
+            # html is only rendered when something uses it
+            html_text = None
+            if include_metadata or eparse_mode == "unstructured":
+                html_text = chunk.to_html(index=False, header=include_header, na_rep="")
+
+            if include_metadata:
+                record_locator = {
                     "excel_RC": excel_RC,
                     "table_name": table_name,
-                },
-            )
-            metadata = ElementMetadata(
-                text_as_html=html_text,
-                page_name=sheet_name,
-                page_number=table_number,
-                filename=metadata_filename or filename,
-                last_modified=metadata_last_modified or last_modification_date,
-                data_source=datasource_metadata,
-            )
-        else:
-            metadata = ElementMetadata()
-
-        text = ""
-
-        if eparse_mode == "eparse":
-            text = str(table.iloc[:eparse_max_rows, :eparse_max_cols])
-
-            if "digest" in eparse_mode:
-                digest = get_table_digest(
-                    df_serialize_table(table),
+                }
+                if eparse_chunk_rows:
+                    # sheet rows (0-based) covered by the chunk body
+                    record_locator["chunk"] = chunk_number
+                    record_locator["rows"] = [
+                        int(chunk.index[1 if len(chunk) > 1 else 0]),
+                        int(chunk.index[-1]),
+                    ]
+
+                datasource_metadata = DataSourceMetadata(record_locator=record_locator)
+                metadata = ElementMetadata(
+                    text_as_html=html_text,
+                    page_name=sheet_name,
+                    page_number=table_number,
+                    filename=metadata_filename or filename,
+                    last_modified=metadata_last_modified or last_modification_date,
+                    data_source=datasource_metadata,
+                )
+            else:
+                metadata = ElementMetadata()
+
+            text = ""
+
+            if eparse_mode == "eparse":
+                text = str(chunk.iloc[:eparse_max_rows, :eparse_max_cols])
+
+            elif eparse_mode in ("digest", "table-digest"):
+                # digest straight from the dataframe, no per-cell serialization
+                digest = get_df_digest(
+                    chunk,
                     table_name=table_name,
+                    max_headers=eparse_max_headers,
+                    max_type_rows=eparse_max_type_rows,
                 )
                 if eparse_mode == "table-digest":
                     text = (
                         f"{table_name} is a spreadsheet table. This is "
-                        f"the head of the table:\n{table.head(eparse_max_rows)}\n"
+                        f"the head of the table:\n{chunk.head(eparse_max_rows)}\n"
                         f"Summary: {digest}."
                     )
                 else:
                     text = digest
 
-        elif eparse_mode == "unstructured":
-            text = lxml.html.document_fromstring(html_text).text_content()
+            elif eparse_mode == "unstructured":
+                text = lxml.html.document_fromstring(html_text).text_content()
 
-        table = Table(text=text, metadata=metadata)
-        elements.append(table)
+            yield Table(text=text, metadata=metadata)
+
+
+@process_metadata()
+@add_metadata_with_filetype(FileType.XLSX)
+def partition_xlsx(
+    filename: Optional[str] = None,
+    file: Optional[Union[IO[bytes], SpooledTemporaryFile]] = None,
+    metadata_filename: Optional[str] = None,
+    include_metadata: bool = True,
+    metadata_last_modified: Optional[str] = None,
+    include_header: bool = True,
+    **kwargs,
+) -> List[Element]:
+    """Partitions Microsoft Excel Documents in .xlsx format into its document elements.
 
-    return elements
+    Parameters
+    ----------
+    filename
+        A string defining the target filename path.
+    file
+        A file-like object using "rb" mode --> open(filename, "rb").
+    include_metadata
+        Determines whether or not metadata is included in the output.
+    metadata_last_modified
+        The day of the last modification
+    include_header
+        Determines whether or not header info info is included in text and medatada.text_as_html
+    eparse_chunk_rows
+        Split tables into elements of at most this many rows (plus the header row), so
+        element size is bounded no matter how big the table is. Off by default.
+    eparse_max_headers
+        Cap the number of row and column names listed in digests, so digests of very
+        large tables stay short.
+    eparse_max_type_rows
+        Only look at this many rows of each table for the cell types listed in digests,
+        so digests of very large tables stay fast.
+    """
+    return list(
+        iter_partition_xlsx(
+            filename=filename,
+            file=file,
+            metadata_filename=metadata_filename,
+            include_metadata=include_metadata,
+            metadata_last_modified=metadata_last_modified,
+            include_header=include_header,
+            **kwargs,
+        )
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+"""
+excel parser query cache
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+_MISSING = object()
+
+
+def cache_key(
+    database: str,
+    method: str,
+    filters: Dict,
+    version: int,
+) -> str:
+    """
+    build a stable cache key from a query and the data version
+    """
+
+    normalized = sorted((str(k), str(v)) for k, v in filters.items())
+    payload = json.dumps([database, method, normalized, version])
+
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class QueryCache:
+    """
+    size-bounded query result cache held in memory and optionally on disk
+
+    keys embed the data version of the source database, so results are
+    invalidated as soon as an output or migration bumps that version
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 128,
+        path: Optional[str] = None,
+        max_files: int = 1024,
+    ):
+        self.maxsize = maxsize
+        self.path = Path(path) if path is not None else None
+        self.max_files = max_files
+        self._data = OrderedDict()
+
+        if self.path is not None:
+            self.path.mkdir(parents=True, exist_ok=True)
+
+    def _file(self, key: str) -> Path:
+        return self.path / f"{key}.pkl"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        return a cached result or default
+        """
+
+        value = self._data.get(key, _MISSING)
+
+        if value is not _MISSING:
+            self._data.move_to_end(key)
+            return value
+
+        if self.path is None:
+            return default
+
+        try:
+            with open(self._file(key), "rb") as f:
+                value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return default
+
+        # refresh mtime so disk eviction is least-recently-used
+        os.utime(self._file(key))
+        self._remember(key, value)
+
+        return value
+
+    def set(self, key: str, value: Any):
+        """
+        store a result in memory and on disk
+        """
+
+        self._remember(key, value)
+
+        if self.path is None:
+            return
+
+        tmp = self.path / f"{key}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self._file(key))
+
+        self._evict_files()
+
+    def clear(self):
+        """
+        drop all cached results
+        """
+
+        self._data.clear()
+
+        if self.path is not None:
+            for f in self.path.glob("*.pkl"):
+                f.unlink(missing_ok=True)
+
+    def _remember(self, key: str, value: Any):
+        self._data[key] = value
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def _evict_files(self):
+        files = list(self.path.glob("*.pkl"))
+
+        if len(files) <= self.max_files:
+            return
+
+        files.sort(key=lambda f: f.stat().st_mtime)
+
+        for f in files[: len(files) - self.max_files]:
+            f.unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._data)
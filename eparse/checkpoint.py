@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+
+"""
+excel parser checkpoints
+
+progress is appended to a sidecar json lines file after each table is
+output, so an interrupted crawl can be resumed ; it is fsync'd when a
+file is done and at most every sync_every marks or sync_interval
+seconds in between, since replaying a few tables is harmless ; files
+are identified by path, size and mtime, so changed files are redone
+"""
+
+import json
+import os
+from pathlib import Path
+from time import monotonic
+from typing import Dict, Optional, Tuple
+
+
+class Checkpoint:
+    """
+    durable record of completed files and table positions
+    """
+
+    def __init__(
+        self,
+        path: str,
+        resume: bool = True,
+        sync_every: int = 100,
+        sync_interval: float = 1.0,
+    ):
+        self.path = Path(path)
+        self.state = {}
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.unsynced = 0
+        self.synced = monotonic()
+
+        if resume:
+            self.load()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._compact()
+        self.file = open(self.path, "a")
+
+    @staticmethod
+    def key(f: Path) -> Tuple[str, int, int]:
+        st = os.stat(f)
+        return (str(Path(f).resolve()), st.st_size, st.st_mtime_ns)
+
+    def load(self):
+        """
+        replay the checkpoint file (a torn last line is ignored)
+        """
+
+        if not self.path.exists():
+            return
+
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    r = json.loads(line)
+                except ValueError:
+                    continue
+
+                self.state[(r["file"], r["size"], r["mtime"])] = r
+
+    def _compact(self):
+        # rewrite one line per file so the checkpoint does not grow forever
+        tmp = self.path.with_name(f"{self.path.name}.tmp")
+
+        with open(tmp, "w") as f:
+            for r in self.state.values():
+                f.write(json.dumps(r) + "\n")
+
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp, self.path)
+
+    def _get(self, f: Path) -> Dict:
+        return self.state.get(self.key(f), {})
+
+    def done(self, f: Path) -> bool:
+        """
+        True if f was completely processed
+        """
+
+        return self._get(f).get("done", False)
+
+    def position(self, f: Path) -> int:
+        """
+        number of tables in f already output
+        """
+
+        return self._get(f).get("tables", 0)
+
+    def mark(
+        self,
+        f: Path,
+        tables: int,
+        done: bool = False,
+        skipped: Optional[str] = None,
+    ):
+        """
+        record that tables in f have been output (and if f is done)
+
+        files given up on are recorded as done with the skipped reason
+        """
+
+        name, size, mtime = self.key(f)
+        r = {"file": name, "size": size, "mtime": mtime, "tables": tables}
+        r["done"] = done
+
+        if skipped is not None:
+            r["skipped"] = skipped
+
+        self.state[(name, size, mtime)] = r
+        self.file.write(json.dumps(r) + "\n")
+        self.file.flush()
+        self.unsynced += 1
+
+        if (
+            done
+            or self.unsynced >= self.sync_every
+            or monotonic() - self.synced >= self.sync_interval
+        ):
+            self.sync()
+
+    def sync(self):
+        """
+        make the marks written so far durable
+        """
+
+        if self.unsynced:
+            os.fsync(self.file.fileno())
+
+        self.unsynced = 0
+        self.synced = monotonic()
+
+    def close(self):
+        self.file.flush()
+        self.sync()
+        self.file.close()
+
+
+class NullCheckpoint(Checkpoint):
+    """
+    no-op checkpoint used when checkpointing is disabled
+    """
+
+    def __init__(self):
+        pass
+
+    def done(self, f: Path) -> bool:
+        return False
+
+    def position(self, f: Path) -> int:
+        return 0
+
+    def mark(self, *args, **kwargs):
+        pass
+
+    def sync(self):
+        pass
+
+    def close(self):
+        pass
+
+
+NULL_CHECKPOINT = NullCheckpoint()
@@ -10,20 +10,24 @@ from pathlib import Path
 from pprint import PrettyPrinter
 
 import click
-import pandas as pd
 
-from .core import (
-    df_find_tables,
-    df_normalize_data,
-    df_serialize_table,
-    get_df_from_file,
-)
-from .interfaces import ExcelParse, i_factory
+from .cache import QueryCache
+from .checkpoint import NULL_CHECKPOINT, Checkpoint
+from .discover import Discovery
+from .profiler import NULL_PROFILER, Profiler
+from .stats import NULL_STATS, Stats
+
+# NOTE: pandas, openpyxl and peewee (via .core and .interfaces) are
+#       imported inside the commands that need them to keep cli
+#       startup fast ; see tests/test_cli.py::test_lazy_imports
 
 
-def handle(e, exceptions=None, msg=None, debug=False, exit=True):
+def handle(e, exceptions=None, msg=None, debug=False, exit=True, file=None):
     """
     handle exceptions based on settings
+
+    msg is printed to file (stdout by default), pass ctx.obj["log"] so
+    stream output on stdout stays clean
     """
 
     if msg is None:
@@ -33,7 +37,7 @@ def handle(e, exceptions=None, msg=None, debug=False, exit=True):
         exceptions = [exceptions]
 
     if exceptions is None or type(e) in exceptions:
-        print(msg)
+        print(msg, file=file)
 
         if debug:
             raise e
@@ -41,6 +45,226 @@ def handle(e, exceptions=None, msg=None, debug=False, exit=True):
             sys.exit(1)
 
 
+def report_stats(ctx, f_name=None):
+    """
+    print file or aggregate stats if enabled
+
+    files are keyed by their full path so same-named files in different
+    directories are reported apart
+    """
+
+    if ctx.obj["stats"]:
+        print(ctx.obj["stats_obj"].format(f_name), file=ctx.obj["log"])
+
+
+def get_profiler(ctx, path=None, top=10):
+    """
+    return a profiler for the profile directory or a no-op profiler
+    """
+
+    if path is None:
+        return NULL_PROFILER
+
+    # sheet shapes are collected through stats
+    if ctx.obj["stats_obj"] is NULL_STATS:
+        ctx.obj["stats_obj"] = Stats()
+
+    return Profiler(path, top, ctx.obj["stats_obj"])
+
+
+def finish(ctx, profiler=NULL_PROFILER):
+    """
+    report aggregate stats and slowest profiled files
+    """
+
+    ctx.obj["stats_obj"].end_file()
+    report_stats(ctx)
+
+    if ctx.obj["verbose"]:
+        files = ctx.obj["files"]
+        m = f"found {files.found} files ({files.rejected} rejected)"
+        print(m, file=ctx.obj["log"])
+
+    if profiler is NULL_PROFILER:
+        return
+
+    for r in profiler.slowest():
+        sheets = []
+        for s in r["sheets"]:
+            n = "" if s["candidates"] is None else f' {s["candidates"]} candidates'
+            sheets.append(f'{s["sheet"]} {tuple(s["shape"])}{n}')
+
+        print(f'{r["time"]:.3f}s {r["file"]} {", ".join(sheets)}', file=ctx.obj["log"])
+
+    print(f"profiles written to {profiler.path}", file=ctx.obj["log"])
+    profiler.write_report()
+
+
+def scan_file(ctx, f):
+    """
+    scan a single excel file
+    """
+
+    import pandas as pd
+
+    from .core import df_find_tables
+
+    sheet = ctx.obj["sheet"]
+    stats = ctx.obj["stats_obj"]
+
+    f_size = f.stat().st_size
+    stats.start_file(str(f), f_size)
+
+    try:
+        with stats.phase("read"):
+            e_file = pd.read_excel(
+                f,
+                sheet_name=sheet,
+                header=None,
+                index_col=None,
+            )
+    except Exception as e:
+        msg = f"skipping {f} - {e}"
+        handle(e, msg=msg, debug=ctx.obj["debug"], exit=False, file=ctx.obj["log"])
+        return
+
+    # get basic info about Excel file
+    f_size_mb = f_size / 1_024_000
+    sheets = []
+
+    if type(e_file) is dict:
+        sheets = e_file.keys()
+
+    # build output result based on options selected
+    result = f"{f.name}"
+
+    if ctx.obj["verbose"]:
+        result += f" {f_size_mb:.2f}MB"
+
+    if sheet is not None:
+        result += f" with {sheet} {e_file.shape}"
+
+        if ctx.obj["tables"]:
+            with stats.phase("find"):
+                t = df_find_tables(e_file, ctx.obj["loose"])
+            stats.count("tables", len(t))
+            stats.note("sheets", (sheet, e_file.shape, len(t)))
+            result += f" containing {len(t)} tables"
+
+            if ctx.obj["verbose"] > 1:
+                result += f" ({t})"
+
+    else:
+        for s in sheets:
+            stats.note("sheets", (s, e_file[s].shape, None))
+
+        if ctx.obj["verbose"]:
+            result += f" with {len(sheets)} sheets"
+
+        if ctx.obj["verbose"] > 1 and len(sheets):
+            result += f' {",".join(sheets)}'
+
+    # print result
+    print(result)
+    report_stats(ctx, str(f))
+
+    if ctx.obj["debug"]:
+        PrettyPrinter(stream=ctx.obj["log"]).pprint(e_file)
+
+
+def parse_file(ctx, f, tables=None):
+    """
+    parse table(s) from a single excel file and send them to output
+
+    tables may be passed in if they were already read (e.g. by a worker)
+    """
+
+    from .core import OutputError, get_df_from_file, output_tables
+
+    stats = ctx.obj["stats_obj"]
+
+    print(f"{f.name}", file=ctx.obj["log"])
+    stats.start_file(str(f), f.stat().st_size)
+
+    if tables is None:
+        tables = get_df_from_file(
+            f,
+            ctx.obj["loose"],
+            ctx.obj["sheet"],
+            ctx.obj["table"],
+            ctx.obj["na_tolerance_r"],
+            ctx.obj["na_tolerance_c"],
+            exclude_nested=ctx.obj["exclude_nested"],
+            stats=stats,
+        )
+
+    tables = output_tables(
+        f,
+        tables,
+        ctx.obj["output_obj"],
+        serialize=ctx.obj["serialize"],
+        replace=ctx.obj["replace"],
+        dedupe=ctx.obj["dedupe_tables"],
+        stats=stats,
+        checkpoint=ctx.obj["checkpoint"],
+        ctx=ctx,
+    )
+
+    try:
+        for df, output, excel_RC, name, s in tables:
+            if ctx.obj["verbose"]:
+                m = "{} table {} {} found at {} in {}"
+                v = (f.name, name, df.shape, excel_RC, s)
+                print(m.format(*v), file=ctx.obj["log"])
+
+            if ctx.obj["debug"]:
+                PrettyPrinter(stream=ctx.obj["log"]).pprint(output)
+
+    except OutputError as e:
+        msg = f'output to {ctx.obj["output"]} failed - {e}'
+        handle(e, msg=msg, debug=ctx.obj["debug"], exit=False, file=ctx.obj["log"])
+
+    except Exception as e:
+        msg = f"skipping {f} - {e}"
+        handle(e, msg=msg, debug=ctx.obj["debug"], exit=False, file=ctx.obj["log"])
+        return
+
+    report_stats(ctx, str(f))
+
+
+def parse_isolated(ctx, f):
+    """
+    read tables from f in a worker within its time and memory budget
+    """
+
+    from .worker import BudgetExceeded, read_tables, run_isolated
+
+    try:
+        tables = run_isolated(
+            read_tables,
+            f,
+            ctx.obj["loose"],
+            ctx.obj["sheet"],
+            ctx.obj["table"],
+            ctx.obj["na_tolerance_r"],
+            ctx.obj["na_tolerance_c"],
+            exclude_nested=ctx.obj["exclude_nested"],
+            timeout=ctx.obj["timeout"],
+            memory=ctx.obj["memory"],
+        )
+    except BudgetExceeded as e:
+        handle(e, msg=f"skipping {f} - {e}", exit=False, file=ctx.obj["log"])
+        ctx.obj["stats_obj"].count("skipped")
+        ctx.obj["checkpoint"].mark(f, 0, done=True, skipped=str(e))
+        return
+    except Exception as e:
+        msg = f"skipping {f} - {e}"
+        handle(e, msg=msg, debug=ctx.obj["debug"], exit=False, file=ctx.obj["log"])
+        return
+
+    parse_file(ctx, f, tables)
+
+
 @click.group()
 @click.pass_context
 @click.option(
@@ -98,6 +322,30 @@ def handle(e, exceptions=None, msg=None, debug=False, exit=True):
     count=True,
     help="increase output verbosity",
 )
+@click.option(
+    "--stats",
+    is_flag=True,
+    default=False,
+    help="report time and throughput per phase",
+)
+@click.option(
+    "--include",
+    type=str,
+    multiple=True,
+    help="only target files matching these glob(s)",
+)
+@click.option(
+    "--exclude",
+    type=str,
+    multiple=True,
+    help="skip files and dirs matching these glob(s)",
+)
+@click.option(
+    "--walkers",
+    type=int,
+    default=4,
+    help="number of dirs to list concurrently when finding files",
+)
 def main(
     ctx,
     input,
@@ -108,11 +356,17 @@ def main(
     recursive,
     truncate,
     verbose,
+    stats,
+    include,
+    exclude,
+    walkers,
 ):
     """
     excel parser
     """
 
+    from .interfaces import ExcelParse, StreamInterface, i_factory
+
     ctx.obj["input"] = input
     ctx.obj["output"] = output
     ctx.obj["file"] = file
@@ -121,31 +375,39 @@ def main(
     ctx.obj["recursive"] = recursive
     ctx.obj["truncate"] = truncate
     ctx.obj["verbose"] = verbose
-
-    files = []
-
-    # get target file(s)
-    for i in file:
-        if Path(i).is_dir():
-            g = "**/*" if recursive else "*"
-            files += Path(i).glob(g)
-        elif Path(i).is_file():
-            files.append(Path(i))
-
-    ctx.obj["files"] = files
-
-    if ctx.obj["verbose"]:
-        print(f"found {len(files)} files")
+    ctx.obj["stats"] = stats
+    ctx.obj["stats_obj"] = Stats() if stats else NULL_STATS
+    ctx.obj["checkpoint"] = NULL_CHECKPOINT
+
+    def on_reject(f, reason):
+        print(f"skipping {f} - {reason}", file=ctx.obj["log"])
+
+    # get target file(s) lazily so processing starts with the first one
+    ctx.obj["files"] = Discovery(
+        file,
+        recursive,
+        include=include,
+        exclude=exclude,
+        workers=walkers,
+        on_reject=on_reject,
+    )
 
     # get input and output objects
     for t in ("input", "output"):
         try:
             ctx.obj[f"{t}_obj"] = i_factory(ctx.obj[t], ExcelParse)
         except ValueError as e:
-            handle(e, msg=f"{t} error - {e}", debug=debug)
+            handle(e, msg=f"{t} error - {e}", debug=debug, file=sys.stderr)
+
+    # keep stdout clean for machine-readable stream output
+    o = ctx.obj.get("output_obj")
+    is_stream = isinstance(o, StreamInterface) and not o.name
+    ctx.obj["log"] = sys.stderr if is_stream else sys.stdout
 
     # set truncate option
     if not truncate:
+        import pandas as pd
+
         # pd.set_option('display.max_colwidth', None)
         pd.set_option("display.max_rows", None)
 
@@ -173,7 +435,19 @@ def main(
     default=False,
     help="count tables in scanned sheets",
 )
-def scan(ctx, number, sheet, tables):
+@click.option(
+    "--profile",
+    type=str,
+    default=None,
+    help="write a cProfile profile per file to this directory",
+)
+@click.option(
+    "--profile-top",
+    type=int,
+    default=10,
+    help="number of slowest profiled files to report",
+)
+def scan(ctx, number, sheet, tables, profile, profile_top):
     """
     scan for excel files in target
     """
@@ -183,62 +457,165 @@ def scan(ctx, number, sheet, tables):
     ctx.obj["tables"] = tables
 
     if ctx.obj["debug"]:
-        PrettyPrinter().pprint(ctx.obj)
+        PrettyPrinter(stream=ctx.obj["log"]).pprint(ctx.obj)
+
+    profiler = get_profiler(ctx, profile, profile_top)
 
     # process each Excel file in files
     for i, f in enumerate(ctx.obj["files"]):
-        if f.is_file() and "xls" in f.name:
-            try:
-                e_file = pd.read_excel(
-                    f,
-                    sheet_name=sheet,
-                    header=None,
-                    index_col=None,
-                )
-            except Exception as e:
-                msg = f"skipping {f} - {e}"
-                handle(e, msg=msg, debug=ctx.obj["debug"], exit=False)
-                continue
+        with profiler.profile(f):
+            scan_file(ctx, f)
 
-            # get basic info about Excel file
-            f_size_mb = f.stat().st_size / 1_024_000
-            sheets = []
+        # continue if number has not been reached
+        if number is not None and i >= number:
+            break
 
-            if type(e_file) is dict:
-                sheets = e_file.keys()
+    finish(ctx, profiler)
 
-            # build output result based on options selected
-            result = f"{f.name}"
 
-            if ctx.obj["verbose"]:
-                result += f" {f_size_mb:.2f}MB"
+@main.command()
+@click.pass_context
+@click.option(
+    "--sheet",
+    "-s",
+    type=str,
+    multiple=True,
+    help="name of sheet(s) to parse",
+)
+@click.option(
+    "--serialize",
+    "-z",
+    is_flag=True,
+    default=False,
+    help="serialize table output",
+)
+@click.option(
+    "--table",
+    "-t",
+    type=str,
+    default=None,
+    help="name of table to parse",
+)
+@click.option(
+    "--nacount",
+    type=int,
+    default=0,
+    help="allow for this many NA values when spanning rows and columns",
+)
+@click.option(
+    "--exclude-nested",
+    is_flag=True,
+    default=False,
+    help="exclude nested tables from output (only top-level tables)",
+)
+@click.option(
+    "--replace",
+    type=click.Choice(["file", "table"]),
+    default=None,
+    help="replace previously stored rows for each file or table",
+)
+@click.option(
+    "--dedupe-tables",
+    is_flag=True,
+    default=False,
+    help="store identical tables once (serialized database output)",
+)
+@click.option(
+    "--profile",
+    type=str,
+    default=None,
+    help="write a cProfile profile per file to this directory",
+)
+@click.option(
+    "--profile-top",
+    type=int,
+    default=10,
+    help="number of slowest profiled files to report",
+)
+@click.option(
+    "--checkpoint",
+    type=str,
+    default=None,
+    help="record progress in this file (default .files/checkpoint.jsonl)",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    default=False,
+    help="skip files and tables recorded in the checkpoint",
+)
+@click.option(
+    "--timeout",
+    type=float,
+    default=None,
+    help="skip files that take longer than this many seconds to read",
+)
+@click.option(
+    "--memory",
+    type=int,
+    default=None,
+    help="skip files that need more than this many MB to read",
+)
+def parse(
+    ctx,
+    sheet,
+    serialize,
+    table,
+    nacount,
+    exclude_nested,
+    replace,
+    dedupe_tables,
+    profile,
+    profile_top,
+    checkpoint,
+    resume,
+    timeout,
+    memory,
+):
+    """
+    parse table(s) found in sheet for target(s)
+    """
 
-            if sheet is not None:
-                result += f" with {sheet} {e_file.shape}"
+    ctx.obj["sheet"] = sheet
+    ctx.obj["serialize"] = serialize
+    ctx.obj["table"] = table
+    ctx.obj["na_tolerance_r"] = nacount + 1
+    ctx.obj["na_tolerance_c"] = nacount + 1
+    ctx.obj["exclude_nested"] = exclude_nested
+    ctx.obj["replace"] = replace
+    ctx.obj["dedupe_tables"] = dedupe_tables
+    ctx.obj["timeout"] = timeout
+    ctx.obj["memory"] = memory if memory is None else memory * 1_000_000
 
-                if tables:
-                    t = df_find_tables(e_file, ctx.obj["loose"])
-                    result += f" containing {len(t)} tables"
+    if ctx.obj["debug"]:
+        PrettyPrinter(stream=ctx.obj["log"]).pprint(ctx.obj)
 
-                    if ctx.obj["verbose"] > 1:
-                        result += f" ({t})"
+    if replace is not None:
+        ctx.obj["output_obj"].replace = replace
 
-            else:
-                if ctx.obj["verbose"]:
-                    result += f" with {len(sheets)} sheets"
+    # read each file in an isolated worker when it has a budget
+    isolate = timeout is not None or memory is not None
 
-                if ctx.obj["verbose"] > 1 and len(sheets):
-                    result += f' {",".join(sheets)}'
+    if checkpoint is not None or resume:
+        path = checkpoint or ".files/checkpoint.jsonl"
+        ctx.obj["checkpoint"] = Checkpoint(path, resume)
 
-            # print result
-            print(result)
+    profiler = get_profiler(ctx, profile, profile_top)
 
-            if ctx.obj["debug"]:
-                PrettyPrinter().pprint(e_file)
+    for f in ctx.obj["files"]:
+        if ctx.obj["checkpoint"].done(f):
+            if ctx.obj["verbose"]:
+                print(f"{f.name} already parsed", file=ctx.obj["log"])
+            continue
+
+        with profiler.profile(f):
+            if isolate:
+                parse_isolated(ctx, f)
+            else:
+                parse_file(ctx, f)
 
-            # continue if number has not been reached
-            if number is not None and i >= number:
-                break
+    ctx.obj["checkpoint"].close()
+    finish(ctx, profiler)
 
 
 @main.command()
@@ -276,67 +653,175 @@ def scan(ctx, number, sheet, tables):
     default=False,
     help="exclude nested tables from output (only top-level tables)",
 )
-def parse(ctx, sheet, serialize, table, nacount, exclude_nested):
+@click.option(
+    "--replace",
+    type=click.Choice(["file", "table"]),
+    default=None,
+    help="replace previously stored rows for each file or table",
+)
+@click.option(
+    "--dedupe-tables",
+    is_flag=True,
+    default=False,
+    help="store identical tables once (serialized database output)",
+)
+@click.option(
+    "--workers",
+    "-w",
+    type=int,
+    default=2,
+    help="number of files to read concurrently",
+)
+@click.option(
+    "--settle",
+    type=float,
+    default=2.0,
+    help="seconds a file must stop changing before it is parsed",
+)
+@click.option(
+    "--interval",
+    type=float,
+    default=1.0,
+    help="seconds between checks for changes",
+)
+@click.option(
+    "--existing",
+    is_flag=True,
+    default=False,
+    help="also parse files already in the directories",
+)
+@click.option(
+    "--poll",
+    is_flag=True,
+    default=False,
+    help="poll for changes instead of using inotify",
+)
+@click.option(
+    "--duration",
+    type=float,
+    default=None,
+    help="stop watching after this many seconds",
+)
+def watch(
+    ctx,
+    sheet,
+    serialize,
+    table,
+    nacount,
+    exclude_nested,
+    replace,
+    dedupe_tables,
+    workers,
+    settle,
+    interval,
+    existing,
+    poll,
+    duration,
+):
     """
-    parse table(s) found in sheet for target(s)
+    parse new or modified excel files as they appear in target dir(s)
     """
 
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+    from time import monotonic
+
+    from .watch import Watcher
+    from .worker import read_tables, warm
+
     ctx.obj["sheet"] = sheet
     ctx.obj["serialize"] = serialize
     ctx.obj["table"] = table
     ctx.obj["na_tolerance_r"] = nacount + 1
     ctx.obj["na_tolerance_c"] = nacount + 1
+    ctx.obj["exclude_nested"] = exclude_nested
+    ctx.obj["replace"] = replace
+    ctx.obj["dedupe_tables"] = dedupe_tables
 
     if ctx.obj["debug"]:
-        PrettyPrinter().pprint(ctx.obj)
+        PrettyPrinter(stream=ctx.obj["log"]).pprint(ctx.obj)
 
-    for f in ctx.obj["files"]:
-        if f.is_file() and "xls" in f.name:
-            print(f"{f.name}")
+    if replace is not None:
+        ctx.obj["output_obj"].replace = replace
 
-            try:
-                for (
-                    output,
-                    excel_RC,
-                    name,
-                    s,
-                ) in get_df_from_file(
-                    f,
-                    ctx.obj["loose"],
-                    sheet,
-                    table,
-                    ctx.obj["na_tolerance_r"],
-                    ctx.obj["na_tolerance_c"],
-                    exclude_nested=exclude_nested,
-                ):
-                    if ctx.obj["verbose"]:
-                        m = "{} table {} {} found at {} in {}"
-                        v = (f.name, name, output.shape, excel_RC, s)
-                        print(m.format(*v))
-
-                    if serialize:
-                        output = df_serialize_table(
-                            output,
-                            name=name,
-                            sheet=s,
-                            f_name=f.name,
-                        )
-
-                    if ctx.obj["debug"]:
-                        PrettyPrinter().pprint(output)
-
-                    try:
-                        ctx.obj["output_obj"].output(output, ctx)
-                    except Exception as e:
-                        msg = f'output to {ctx.obj["output"]} failed - {e}'
-                        handle(e, msg=msg, debug=ctx.obj["debug"], exit=False)
-                        break
+    dirs = [i for i in ctx.obj["file"] if Path(i).is_dir()]
+
+    if not dirs:
+        e = ValueError("no directories to watch")
+        handle(e, msg=f"watch error - {e}", debug=ctx.obj["debug"], file=ctx.obj["log"])
 
+    watcher = Watcher(
+        dirs,
+        ctx.obj["recursive"],
+        settle,
+        interval,
+        existing,
+        inotify=False if poll else None,
+    )
+
+    args = (ctx.obj["loose"], sheet, table, nacount + 1, nacount + 1)
+    running = {}
+
+    def collect(block):
+        # output finished files in the main process, one at a time
+        done, _ = wait(
+            running,
+            timeout=None if block else 0,
+            return_when=FIRST_COMPLETED,
+        )
+
+        for future in done:
+            f = running.pop(future)
+
+            try:
+                tables = future.result()
             except Exception as e:
                 msg = f"skipping {f} - {e}"
-                handle(e, msg=msg, debug=ctx.obj["debug"], exit=False)
+                handle(
+                    e, msg=msg, debug=ctx.obj["debug"], exit=False, file=ctx.obj["log"]
+                )
                 continue
 
+            parse_file(ctx, f, tables)
+
+    print(f"watching {', '.join(dirs)}", file=ctx.obj["log"])
+    start = monotonic()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=warm) as pool:
+        try:
+            while duration is None or monotonic() - start < duration:
+                for f in sorted(watcher.ready()):
+                    if f in running.values():
+                        # still reading the previous version, check again later
+                        watcher.queue(f)
+                        continue
+
+                    if not ctx.obj["files"].accept(str(f)):
+                        continue
+
+                    while len(running) >= workers:
+                        collect(True)
+
+                    future = pool.submit(
+                        read_tables,
+                        f,
+                        *args,
+                        exclude_nested=exclude_nested,
+                    )
+                    running[future] = f
+
+                collect(False)
+
+        except KeyboardInterrupt:
+            pass
+
+        finally:
+            watcher.close()
+
+        while running:
+            collect(True)
+
+    finish(ctx)
+
 
 @main.command()
 @click.pass_context
@@ -362,37 +847,50 @@ def parse(ctx, sheet, serialize, table, nacount, exclude_nested):
     default=False,
     help="serialize query output",
 )
-def query(ctx, filter, method, serialize):
+@click.option(
+    "--cache",
+    "-c",
+    type=str,
+    default=None,
+    help="cache query results in this directory",
+)
+def query(ctx, filter, method, serialize, cache):
     """
     query eparse output
     """
 
     ctx.obj["filters"] = {k: v for k, v in filter}
     ctx.obj["method"] = method
+    ctx.obj["cache"] = cache
+
+    if cache is not None:
+        ctx.obj["input_obj"].cache = QueryCache(path=cache)
 
     if ctx.obj["debug"]:
-        PrettyPrinter().pprint(ctx.obj)
+        PrettyPrinter(stream=ctx.obj["log"]).pprint(ctx.obj)
 
     # input data
     try:
         data = ctx.obj["input_obj"].input(method, **ctx.obj["filters"])
     except Exception as e:
         msg = f'input from {ctx.obj["input"]} failed with {e}'
-        handle(e, msg=msg, debug=ctx.obj["debug"])
+        handle(e, msg=msg, debug=ctx.obj["debug"], file=ctx.obj["log"])
 
     if serialize:
+        from .core import df_normalize_data
+
         try:
             data = [df_normalize_data(d) for d in data.to_dict("records")]
         except Exception as e:
             msg = "serialization error (some methods can't be serialized)"
-            handle(e, msg=f"{msg} - {e}", debug=ctx.obj["debug"])
+            handle(e, msg=f"{msg} - {e}", debug=ctx.obj["debug"], file=ctx.obj["log"])
 
     # output data
     try:
         ctx.obj["output_obj"].output(data, ctx)
     except Exception as e:
         msg = f'output to {ctx.obj["output"]} failed with {e}'
-        handle(e, msg=msg, debug=ctx.obj["debug"])
+        handle(e, msg=msg, debug=ctx.obj["debug"], file=ctx.obj["log"])
 
 
 @main.command()
@@ -413,15 +911,99 @@ def migrate(ctx, migration):
     ctx.obj["migration"] = migration
 
     if ctx.obj["debug"]:
-        PrettyPrinter().pprint(ctx.obj)
+        PrettyPrinter(stream=ctx.obj["log"]).pprint(ctx.obj)
+
+    def progress(task, done, total):
+        if ctx.obj["verbose"]:
+            print(f"{task} {done}/{total}")
 
     # apply migrations
     for _migration in ctx.obj["migration"]:
         try:
-            ctx.obj["input_obj"].migrate(_migration)
-            print(f"applied {_migration}")
+            if ctx.obj["input_obj"].migrate(_migration, progress) is False:
+                print(f"{_migration} already applied")
+            else:
+                print(f"applied {_migration}")
         except Exception as e:
-            handle(e, msg=f"migration error - {e}", debug=ctx.obj["debug"])
+            handle(
+                e,
+                msg=f"migration error - {e}",
+                debug=ctx.obj["debug"],
+                file=ctx.obj["log"],
+            )
+
+
+@main.command()
+@click.pass_context
+@click.option(
+    "--batch-size",
+    "-b",
+    type=int,
+    default=1000,
+    help="number of rows to delete per transaction",
+)
+def dedupe(ctx, batch_size):
+    """
+    remove duplicate rows from eparse table
+    """
+
+    ctx.obj["batch_size"] = batch_size
+
+    if ctx.obj["debug"]:
+        PrettyPrinter(stream=ctx.obj["log"]).pprint(ctx.obj)
+
+    ctx.obj["input_obj"].batch_size = batch_size
+
+    def progress(n):
+        if ctx.obj["verbose"]:
+            print(f"deleted {n} rows")
+
+    try:
+        deleted = ctx.obj["input_obj"].dedupe(progress)
+        print(f"removed {deleted} duplicate rows")
+    except Exception as e:
+        handle(
+            e, msg=f"dedupe error - {e}", debug=ctx.obj["debug"], file=ctx.obj["log"]
+        )
+
+
+@main.command()
+@click.pass_context
+@click.option(
+    "--address",
+    "-a",
+    type=str,
+    default="http://127.0.0.1:8765",
+    help="http://host:port or unix:///path to listen on",
+)
+@click.option(
+    "--workers",
+    "-w",
+    type=int,
+    default=2,
+    help="number of worker processes",
+)
+def serve(ctx, address, workers):
+    """
+    serve scan, parse and query requests from a warm process
+    """
+
+    from .server import serve as _serve
+
+    ctx.obj["address"] = address
+    ctx.obj["workers"] = workers
+
+    if ctx.obj["debug"]:
+        PrettyPrinter(stream=ctx.obj["log"]).pprint(ctx.obj)
+
+    print(f"serving on {address} with {workers} workers")
+
+    try:
+        _serve(address, workers, verbose=bool(ctx.obj["verbose"]))
+    except Exception as e:
+        handle(
+            e, msg=f"server error - {e}", debug=ctx.obj["debug"], file=ctx.obj["log"]
+        )
 
 
 def entry_point():
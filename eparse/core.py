@@ -4,14 +4,102 @@
 excel parser core module
 """
 
-from io import StringIO
-from typing import Any, Dict, Iterable, List, Optional, Tuple
-
+import bisect
+import hashlib
+from collections.abc import Mapping as MappingABC
+from io import BytesIO, StringIO
+from pathlib import Path
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import numpy as np
 import pandas as pd
-from openpyxl.utils.cell import get_column_letter
 
-TableRef = Tuple[int, int, str, str]  # r, c, excel RC, value
+from .checkpoint import NULL_CHECKPOINT, Checkpoint
+from .stats import NULL_STATS, Stats
+
+
+class TableRef(NamedTuple):
+    """
+    table corner found in a sheet (a plain tuple, use _asdict for a dict)
+    """
+
+    r: int
+    c: int
+    excel_RC: str
+    value: str
+
+
+INT_FIELDS = ("row", "column")
+STR_FIELDS = (
+    "value",
+    "type",
+    "c_header",
+    "r_header",
+    "excel_RC",
+    "name",
+    "sheet",
+    "f_name",
+)
+
+
+class CellRecord(MappingABC):
+    """
+    compact serialized cell
+
+    fields are kept in slots instead of a dict, but a record reads like
+    the dict from df_normalize_data (fields not given are not keys) and
+    dict(record) is that dict ; interfaces accept records wherever they
+    accept serialized dicts
+    """
+
+    __slots__ = INT_FIELDS + STR_FIELDS + ("timestamp",)
+
+    def __init__(self, **data):
+        for k in INT_FIELDS:
+            if k in data:
+                setattr(self, k, int(data[k]))
+
+        for k in STR_FIELDS:
+            if k in data:
+                setattr(self, k, str(data[k]))
+
+        if isinstance(data.get("timestamp"), pd.Timestamp):
+            self.timestamp = data["timestamp"].to_pydatetime()
+
+    def __getitem__(self, key: str) -> Any:
+        # peewee also looks rows up by field objects
+        if not isinstance(key, str) or key not in self.__slots__:
+            raise KeyError(key)
+
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
 
+    def __iter__(self) -> Iterator[str]:
+        return (k for k in self.__slots__ if hasattr(self, k))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"CellRecord({dict(self)!r})"
+
+
+# NOTE: openpyxl is imported where it is used so that importing this
+#       module without parsing excel files (e.g. to query) stays fast
 
 # NOTE: df[n] df.at[r,c] and df.iloc[r,c] are not all the same
 #       only with .iloc is it safe to assume index and column
@@ -22,11 +110,32 @@ TableRef = Tuple[int, int, str, str]  # r, c, excel RC, value
 def df_find_tables(
     df: pd.DataFrame,
     loose: bool = False,
+    block_size: Optional[int] = 64,
+    notna: Optional[np.ndarray] = None,
 ) -> List[TableRef]:
     """
     finds table corners in a dataframe
+
+    with block_size, occupancy is summarized per block_size x block_size
+    tile and corners are only looked for in occupied tiles (with the same
+    result) ; set block_size to None to check every cell one by one
+
+    pass notna (e.g. from an NaIndex) to reuse an existing mask of df
     """
 
+    from openpyxl.utils.cell import get_column_letter
+
+    if block_size is not None:
+        if notna is None:
+            notna = df.notna().to_numpy()
+
+        corners = _find_corners_tiled(notna, loose, block_size)
+
+        return [
+            TableRef(r, c, f"{get_column_letter(c+1)}{r+1}", str(df.iat[r, c]))
+            for r, c in corners
+        ]
+
     result = []
 
     # for each row
@@ -66,7 +175,7 @@ def df_find_tables(
 
             if all([isna_left, isna_above, not isna_value, min_size]):
                 result.append(
-                    (
+                    TableRef(
                         r,
                         c,
                         f"{get_column_letter(c+1)}{r+1}",
@@ -77,6 +186,79 @@ def df_find_tables(
     return result
 
 
+def _occupied_tiles(notna: np.ndarray, size: int) -> np.ndarray:
+    """
+    (rows, cols) of size x size tiles that contain at least one value
+    """
+
+    rows, cols = notna.shape
+    tr, tc = -(-rows // size), -(-cols // size)
+
+    padded = np.zeros((tr * size, tc * size), dtype=bool)
+    padded[:rows, :cols] = notna
+
+    return np.argwhere(padded.reshape(tr, size, tc, size).any(axis=(1, 3)))
+
+
+def _find_corners(notna: np.ndarray, loose: bool) -> np.ndarray:
+    """
+    (r, c) of every table corner in a notna mask, vectorized
+    """
+
+    rows, cols = notna.shape
+
+    # pad with NA on every side so neighbors past the edges are NA
+    v = np.zeros((rows + 2, cols + 2), dtype=bool)
+    v[1:-1, 1:-1] = notna
+
+    value = v[1:-1, 1:-1]
+    left = v[1:-1, :-2]
+    above = v[:-2, 1:-1]
+    right = v[1:-1, 2:]
+    down = v[2:, 1:-1]
+    corner = v[2:, 2:]
+
+    if loose:
+        min_size = (right & down) | (right & corner) | (down & corner)
+    else:
+        min_size = right & down & corner
+
+    # tables need a row below and a column to the right inside the sheet
+    min_size[-1:, :] = False
+    min_size[:, -1:] = False
+
+    return np.argwhere(value & ~left & ~above & min_size)
+
+
+def _find_corners_tiled(notna: np.ndarray, loose: bool, size: int) -> List[Tuple]:
+    """
+    corners found only in tiles with values, in row-major order
+    """
+
+    rows, cols = notna.shape
+    corners = []
+
+    for tr, tc in _occupied_tiles(notna, size):
+        r0, c0 = tr * size, tc * size
+        r1, c1 = min(r0 + size, rows), min(c0 + size, cols)
+
+        # look one cell past each side of the tile for neighbors
+        hr0, hc0 = max(r0 - 1, 0), max(c0 - 1, 0)
+        hr1, hc1 = min(r1 + 1, rows), min(c1 + 1, cols)
+        window = _find_corners(notna[hr0:hr1, hc0:hc1], loose)
+
+        for r, c in window:
+            r, c = r + hr0, c + hc0
+
+            # keep corners in this tile (the halo belongs to neighbors)
+            if r0 <= r < r1 and c0 <= c < c1:
+                corners.append((int(r), int(c)))
+
+    corners.sort()
+
+    return corners
+
+
 def _get_table_bounds(df: pd.DataFrame, r: int, c: int) -> Tuple[int, int, int, int]:
     """
     calculate complete table zone from top-left corner
@@ -154,6 +336,80 @@ def _filter_nested_tables(
     return filtered
 
 
+class NaIndex:
+    """
+    run-length index of NA cells in a sheet
+
+    NA runs are encoded per row and per column (when first needed) so
+    the extent of a table can be found with binary search instead of a
+    cell by cell walk ; build it once per sheet and pass it to
+    df_parse_table
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.notna = df.notna().to_numpy()
+        self.shape = self.notna.shape
+        self._values = None
+        self._runs = {}
+        self._long = {}
+
+    @property
+    def values(self) -> np.ndarray:
+        """
+        the sheet as one array (made once, on first use)
+        """
+
+        if self._values is None:
+            self._values = self.df.to_numpy()
+
+        return self._values
+
+    def runs(self, axis: int, i: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        (starts, ends) of NA runs in row i (axis 1) or column i (axis 0)
+        """
+
+        key = (axis, i)
+
+        if key not in self._runs:
+            line = self.notna[:, i] if axis == 0 else self.notna[i]
+            edges = np.diff(np.concatenate(([1], line, [1])).astype(np.int8))
+            self._runs[key] = (np.flatnonzero(edges == -1), np.flatnonzero(edges == 1))
+
+        return self._runs[key]
+
+    def span_end(self, axis: int, i: int, start: int, tolerance: int) -> int:
+        """
+        end (exclusive) of a span from start along row or column i
+
+        same as walking from start + 1 and stopping on the cell that
+        completes tolerance consecutive NA cells (or at the sheet edge)
+        """
+
+        starts, ends = self.runs(axis, i)
+        lo = start + 1
+
+        # a run that began at or before lo only counts from lo
+        k = bisect.bisect_right(ends, lo)
+        if k < len(starts) and starts[k] <= lo and ends[k] - lo >= tolerance:
+            return lo + tolerance - 1
+
+        key = (axis, i, tolerance)
+        if key not in self._long:
+            self._long[key] = starts[(ends - starts) >= tolerance]
+
+        long = self._long[key]
+        k = bisect.bisect_left(long, lo)
+        if k < len(long):
+            return int(long[k]) + tolerance - 1
+
+        return self.shape[axis]
+
+    def isna(self, r: int, c: int) -> bool:
+        return not self.notna[r, c]
+
+
 def _is_rowspan(df: pd.DataFrame, r: int, c: int) -> bool:
     """
     detect a rowspan label
@@ -184,16 +440,53 @@ def _has_empty_corner(df: pd.DataFrame, r: int, c: int) -> bool:
         return False
 
 
-def df_parse_table(
+def _table_bounds(
+    index: NaIndex,
+    r: int,
+    c: int,
+    na_tolerance_r: int,
+    na_tolerance_c: int,
+    na_strip: bool,
+) -> Tuple[int, int, int, int]:
+    """
+    (r, _r, c, _c) of the table at r, c using an NaIndex
+
+    same result as the cell by cell walk in df_parse_table
+    """
+
+    rows, cols = index.shape
+
+    # make reference adjustments (see _is_rowspan and _has_empty_corner)
+    if r + 1 < rows and c + 1 < cols:
+        if index.isna(r + 1, c) and not index.isna(r, c + 1):
+            c += 1
+
+    if r >= 1 and c + 1 < cols:
+        if index.isna(r - 1, c) and not index.isna(r - 1, c + 1):
+            r -= 1
+
+    _r = index.span_end(0, c, r, na_tolerance_r)
+    _c = index.span_end(1, r, c, na_tolerance_c)
+
+    # strip ending na
+    if na_strip and not index.notna[_r - 1, c:_c].any():
+        _r -= 1
+    if na_strip and not index.notna[r:_r, _c - 1].any():
+        _c -= 1
+
+    return r, _r, c, _c
+
+
+def _walk_bounds(
     df: pd.DataFrame,
     r: int,
     c: int,
-    na_tolerance_r: int = 1,
-    na_tolerance_c: int = 1,
-    na_strip: bool = True,
-) -> pd.DataFrame:
+    na_tolerance_r: int,
+    na_tolerance_c: int,
+    na_strip: bool,
+) -> Tuple[int, int, int, int]:
     """
-    extract a table from a dataframe for a given r, c position
+    (r, _r, c, _c) of the table at r, c walking cell by cell
     """
 
     # make reference adjustments
@@ -234,32 +527,118 @@ def df_parse_table(
     if na_strip and df.iloc[r:_r, c:_c].iloc[:, ((_c - c) - 1)].isna().all():
         _c -= 1
 
+    return r, _r, c, _c
+
+
+def _bounds(
+    df: pd.DataFrame,
+    na_index: Optional[NaIndex],
+    r: int,
+    c: int,
+    na_tolerance_r: int,
+    na_tolerance_c: int,
+    na_strip: bool,
+) -> Tuple[int, int, int, int]:
+    # the index only answers tolerances of at least one cell
+    if na_index is not None and na_tolerance_r > 0 and na_tolerance_c > 0:
+        return _table_bounds(na_index, r, c, na_tolerance_r, na_tolerance_c, na_strip)
+
+    return _walk_bounds(df, r, c, na_tolerance_r, na_tolerance_c, na_strip)
+
+
+def df_parse_table(
+    df: pd.DataFrame,
+    r: int,
+    c: int,
+    na_tolerance_r: int = 1,
+    na_tolerance_c: int = 1,
+    na_strip: bool = True,
+    na_index: Optional[NaIndex] = None,
+) -> pd.DataFrame:
+    """
+    extract a table from a dataframe for a given r, c position
+
+    pass an NaIndex of df to find the table extent with binary search
+    (useful when parsing many tables from one sheet)
+    """
+
+    r, _r, c, _c = _bounds(df, na_index, r, c, na_tolerance_r, na_tolerance_c, na_strip)
+
     return df.iloc[r:_r, c:_c]
 
 
+class TableView:
+    """
+    lightweight descriptor of a table in a sheet
+
+    nothing is copied until the data is asked for ; values is a view
+    of the sheet's shared array and to_df an iloc slice of the sheet
+    """
+
+    __slots__ = ("sheet", "r", "_r", "c", "_c", "excel_RC", "name")
+
+    def __init__(
+        self,
+        sheet: NaIndex,
+        bounds: Tuple[int, int, int, int],
+        excel_RC: str,
+        name: str,
+    ):
+        self.sheet = sheet
+        self.r, self._r, self.c, self._c = bounds
+        self.excel_RC = excel_RC
+        self.name = name
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return (self._r - self.r, self._c - self.c)
+
+    @property
+    def values(self) -> np.ndarray:
+        return self.sheet.values[self.r : self._r, self.c : self._c]  # noqa: E203
+
+    def to_df(self) -> pd.DataFrame:
+        return self.sheet.df.iloc[self.r : self._r, self.c : self._c]  # noqa: E203
+
+    def __repr__(self) -> str:
+        return f"TableView({self.excel_RC!r}, {self.name!r}, shape={self.shape})"
+
+
+def df_extract_tables(
+    df: Union[pd.DataFrame, NaIndex],
+    tables: Iterable[TableRef],
+    na_tolerance_r: int = 1,
+    na_tolerance_c: int = 1,
+    na_strip: bool = True,
+) -> List[TableView]:
+    """
+    extract all tables in a sheet at once (see df_parse_table)
+
+    every table is bounded with the same NaIndex of the sheet (pass one
+    to reuse it) and returned as a TableView
+    """
+
+    sheet = df if isinstance(df, NaIndex) else NaIndex(df)
+    args = (na_tolerance_r, na_tolerance_c, na_strip)
+
+    return [
+        TableView(sheet, _bounds(sheet.df, sheet, r, c, *args), excel_RC, name)
+        for r, c, excel_RC, name in tables
+    ]
+
+
 def df_normalize_data(data: Dict) -> Dict:
     """
     normalize table data
     """
 
     result = {}
-    ints = ("row", "column")
-    strs = (
-        "value",
-        "type",
-        "c_header",
-        "r_header",
-        "excel_RC",
-        "name",
-        "sheet",
-        "f_name",
-    )
 
-    for k in ints:
+    for k in INT_FIELDS:
         if k in data:
             result[k] = int(data[k])
 
-    for k in strs:
+    for k in STR_FIELDS:
         if k in data:
             result[k] = str(data[k])
 
@@ -270,39 +649,97 @@ def df_normalize_data(data: Dict) -> Dict:
     return result
 
 
-def df_serialize_table(
-    df: pd.DataFrame,
-    **other_data,
-) -> List[Dict]:
+def _cells(df: pd.DataFrame, other_data: Dict) -> Iterator[Dict]:
     """
-    serialize table into a list of dicts with meta data
+    yield raw cell data for each cell in a table
     """
 
+    from openpyxl.utils.cell import get_column_letter
+
     column_header = df.iloc[0]
     row_header = df.iloc[:, 0]
 
-    result = []
-
     for r in range(df.shape[0]):
         for c in range(df.shape[1]):
             _r = df.index[r]  # excel df row
             _c = df.columns[c]  # excel df col
-            result.append(
-                df_normalize_data(
-                    {
-                        "row": r,
-                        "column": c,
-                        "value": df.iloc[r, c],
-                        "type": type(df.iloc[r, c]),
-                        "c_header": column_header.iloc[c],
-                        "r_header": row_header.iloc[r],
-                        "excel_RC": f"{get_column_letter(_c+1)}{_r+1}",
-                        **other_data,
-                    }
-                )
-            )
+            yield {
+                "row": r,
+                "column": c,
+                "value": df.iloc[r, c],
+                "type": type(df.iloc[r, c]),
+                "c_header": column_header.iloc[c],
+                "r_header": row_header.iloc[r],
+                "excel_RC": f"{get_column_letter(_c+1)}{_r+1}",
+                **other_data,
+            }
 
-    return result
+
+def df_serialize_table(
+    df: pd.DataFrame,
+    **other_data,
+) -> List[Dict]:
+    """
+    serialize table into a list of dicts with meta data
+    """
+
+    return [df_normalize_data(d) for d in _cells(df, other_data)]
+
+
+def df_serialize_records(
+    df: pd.DataFrame,
+    **other_data,
+) -> List[CellRecord]:
+    """
+    serialize table into a list of compact CellRecords with meta data
+
+    same data as df_serialize_table in a fraction of the memory
+    """
+
+    return [CellRecord(**d) for d in _cells(df, other_data)]
+
+
+def df_row_windows(
+    df: pd.DataFrame,
+    size: Optional[int] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    lazily yield a table in windows of at most size body rows
+
+    each window starts with the table's header row and is taken in one
+    step (no concat), so only the window being used is ever copied ;
+    the whole table is yielded as is when size is None
+    """
+
+    if not size or len(df) <= size + 1:
+        yield df
+        return
+
+    for start in range(1, len(df), size):
+        rows = np.r_[0, start : min(start + size, len(df))]  # noqa: E203
+        yield df.iloc[rows]
+
+
+def df_fingerprint(df: pd.DataFrame) -> str:
+    """
+    stable content hash of a table
+
+    the shape, column dtypes and every cell value and type (headers
+    included) are hashed in vectorized passes ; the position of the table
+    is not, so identical tables get the same fingerprint in any sheet or
+    file while 1 and "1" do not
+    """
+
+    h = hashlib.sha256(np.asarray(df.shape, dtype="<i8").tobytes())
+    h.update(",".join(str(t) for t in df.dtypes).encode())
+
+    # values hash by their str form, so types are hashed as well
+    values = df.to_numpy(dtype=object).ravel()
+    types = np.frompyfunc(type, 1, 1)(values)
+    h.update(pd.util.hash_array(values).astype("<u8").tobytes())
+    h.update(pd.util.hash_array(types).astype("<u8").tobytes())
+
+    return h.hexdigest()
 
 
 def get_df_from_file(
@@ -314,77 +751,272 @@ def get_df_from_file(
     na_tolerance_c: int = 1,
     na_strip: bool = True,
     exclude_nested: bool = False,
+    stats: Optional[Stats] = None,
 ):
     """
     helper function to yield tables from a file
+
+    pass a Stats object to time the read, find and parse phases
     """
 
-    f = pd.read_excel(
-        io,
-        sheet_name=list(sheet) or None,
-        header=None,
-        index_col=None,
-    )
+    if stats is None:
+        stats = NULL_STATS
+
+    with stats.phase("read"):
+        f = pd.read_excel(
+            io,
+            sheet_name=list(sheet) or None,
+            header=None,
+            index_col=None,
+        )
 
     # convert to dict if single sheet
     if type(f) is not dict:
         f = {s: f for s in sheet}
 
     for s in f.keys():
-        tables = df_find_tables(f[s], loose)
-
-        # apply nested table filter if enabled
-        if exclude_nested:
-            tables = _filter_nested_tables(tables, f[s])
-
-        for r, c, excel_RC, name in tables:
-            if table is not None and table.lower() not in name.lower():
-                continue
-
-            yield (
-                df_parse_table(
-                    f[s],
-                    r,
-                    c,
-                    na_tolerance_r,
-                    na_tolerance_c,
-                    na_strip,
-                ),
-                excel_RC,
-                name,
-                s,
+        with stats.phase("find"):
+            # one notna mask and na index per sheet, shared by its tables
+            sheet_index = NaIndex(f[s])
+            tables = df_find_tables(f[s], loose, notna=sheet_index.notna)
+
+            # apply nested table filter if enabled
+            if exclude_nested:
+                tables = _filter_nested_tables(tables, f[s])
+
+        stats.note("sheets", (s, f[s].shape, len(tables)))
+
+        if table is not None:
+            tables = [t for t in tables if table.lower() in t[3].lower()]
+
+        with stats.phase("parse"):
+            views = df_extract_tables(
+                sheet_index,
+                tables,
+                na_tolerance_r,
+                na_tolerance_c,
+                na_strip,
             )
 
+        for view in views:
+            t = view.to_df()
 
-def get_table_digest(
-    serialized_table: List[Dict],
-    table_name: str,
-    filename: Optional[str] = None,
-    sheet: Optional[str] = None,
-) -> str:
+            stats.count("tables")
+            stats.count("cells", t.size)
+
+            yield (t, view.excel_RC, view.name, s)
+
+
+class OutputError(Exception):
     """
-    generate a digest that describes a serialized table
+    raised by output_tables when tables could not be sent to the output
+    """
+
+
+def output_tables(
+    f: Path,
+    tables: Iterable[Tuple],
+    output: Any,
+    serialize: bool = False,
+    replace: Optional[str] = None,
+    dedupe: bool = False,
+    stats: Optional[Stats] = None,
+    checkpoint: Optional[Checkpoint] = None,
+    ctx: Any = None,
+) -> Iterator[Tuple]:
+    """
+    send the tables read from a file to an output interface
+
+    yields (df, data, excel_RC, name, sheet) for each table before it is
+    output, where data is what is output (compact records when
+    serializing) ; tables already in the checkpoint are skipped and the
+    file is marked done once all of its tables are out
+
+    with replace "file" all tables are output at once at the end, and
+    with dedupe (and serialize) identical tables are stored once ; read
+    errors are raised as is and output errors as OutputError
+    """
+
+    if stats is None:
+        stats = NULL_STATS
+
+    if checkpoint is None:
+        checkpoint = NULL_CHECKPOINT
+
+    dedupe = dedupe and serialize
+    output.start_file(f)
+
+    # replacing a file is one atomic output of all its tables
+    pending = []
+    fingerprints = []
+
+    # tables already output by an interrupted run are skipped
+    position = checkpoint.position(f)
+
+    def send(data, extra):
+        try:
+            with stats.phase("output"):
+                output.output(data, ctx, **extra)
+        except Exception as e:
+            raise OutputError(str(e)) from e
+
+    for i, (df, excel_RC, name, s) in enumerate(tables):
+        if i < position:
+            continue
+
+        data = df
+        extra = {}
+
+        if serialize:
+            with stats.phase("serialize"):
+                # identical tables are stored once when deduping
+                if dedupe:
+                    extra["fingerprints"] = [df_fingerprint(df)]
+
+                data = df_serialize_records(df, name=name, sheet=s, f_name=f.name)
+
+        yield (df, data, excel_RC, name, s)
+
+        position = i + 1
+
+        if replace == "file" and serialize:
+            pending += data
+            fingerprints += extra.get("fingerprints", [])
+            continue
+
+        send(data, extra)
+        checkpoint.mark(f, position)
+
+    if pending:
+        send(pending, {"fingerprints": fingerprints} if dedupe else {})
+
+    checkpoint.mark(f, position, done=True)
+
+
+def _unique(values: Iterable, cap: Optional[int] = None) -> List[str]:
     """
+    unique values as str in order, stopping after cap (marked with ...)
+    """
+
+    result = {}
+
+    for v in values:
+        result[str(v)] = None
+
+        if cap is not None and len(result) > cap:
+            return list(result)[:cap] + ["..."]
 
-    df = pd.DataFrame.from_records(serialized_table)
-    rows = len(df["row"].unique())
-    cols = len(df["column"].unique())
-    c_headers = df["c_header"].unique()
-    r_headers = df["r_header"].unique()
-    types = df["type"].unique()
+    return list(result)
 
+
+def _format_digest(
+    table_name: str,
+    rows: int,
+    cols: int,
+    c_headers: Iterable,
+    r_headers: Iterable,
+    types: Iterable,
+    filename: Optional[str] = None,
+    sheet: Optional[str] = None,
+) -> str:
     sheet_str = f" in sheet {sheet}" if sheet else ""
     file_str = f" of Excel file {filename}" if filename else ""
     type_str = f' {", ".join([str(t) for t in types])} type(s)'
 
-    digest = (
+    return (
         f"{table_name} is a table{sheet_str}{file_str} "
         f'with {cols} column(s) having names like {", ".join(c_headers)} '
         f'and {rows} row(s) having names like {", ".join(r_headers)} '
         f"and contains {rows*cols} cells of{type_str}"
     )
 
-    return digest
+
+def get_table_digest(
+    serialized_table: Union[List[Dict], Mapping[str, Sequence]],
+    table_name: str,
+    filename: Optional[str] = None,
+    sheet: Optional[str] = None,
+    max_headers: Optional[int] = None,
+) -> str:
+    """
+    generate a digest that describes a serialized table
+
+    serialized_table is a list of cell dicts or the columnar form (a
+    dict of lists with the same keys) ; max_headers caps the number of
+    header names listed for rows and columns
+    """
+
+    if isinstance(serialized_table, Mapping):
+        columns = serialized_table
+    else:
+        keys = ("row", "column", "c_header", "r_header", "type")
+        columns = {k: [d[k] for d in serialized_table] for k in keys}
+
+    return _format_digest(
+        table_name,
+        len(set(columns["row"])),
+        len(set(columns["column"])),
+        _unique(columns["c_header"], max_headers),
+        _unique(columns["r_header"], max_headers),
+        _unique(columns["type"]),
+        filename,
+        sheet,
+    )
+
+
+def get_df_digest(
+    df: pd.DataFrame,
+    table_name: str,
+    filename: Optional[str] = None,
+    sheet: Optional[str] = None,
+    max_headers: Optional[int] = None,
+    max_type_rows: Optional[int] = None,
+) -> str:
+    """
+    generate the digest of df without serializing it first
+
+    same result as get_table_digest(df_serialize_table(df), ...) ; cells
+    of non-object columns have the type of the column's values, or of
+    its null value, so only object columns are checked cell by cell
+
+    max_headers caps the header names listed per axis and max_type_rows
+    the rows checked for types, so the time taken does not grow with the
+    size of the table
+    """
+
+    rows, cols = df.shape
+
+    # boxed values (Timestamp, NA) print like the serialized headers
+    c_headers = _unique(df.iloc[0].tolist() if rows else [], max_headers)
+    r_headers = _unique(df.iloc[:, 0].tolist() if cols else [], max_headers)
+
+    # cell types in row-major order (the order of serialized cells)
+    head = df if max_type_rows is None else df.iloc[:max_type_rows]
+    types = np.empty(head.shape, dtype=object)
+
+    for c in range(cols):
+        col = head.iloc[:, c]
+
+        if col.dtype == object:
+            types[:, c] = [type(v) for v in col.to_numpy()]
+            continue
+
+        # values are boxed like .iloc does when serializing
+        na = col.isna().to_numpy()
+        for mask in (na, ~na):
+            if mask.any():
+                types[mask, c] = type(col.iloc[int(mask.argmax())])
+
+    return _format_digest(
+        table_name,
+        rows,
+        cols,
+        c_headers,
+        r_headers,
+        _unique(types.ravel()),
+        filename,
+        sheet,
+    )
 
 
 def html_to_df(
@@ -401,12 +1033,119 @@ def html_to_df(
     )
 
 
+def html_table_rows(
+    html: Union[str, bytes],
+    index: int = 0,
+) -> Iterator[List[str]]:
+    """
+    stream the rows of one table in html as lists of cell text
+
+    rowspan and colspan cells are repeated in each row and column they
+    span, and parsing stops once table number index (in document order,
+    like pd.read_html) has been read
+    """
+
+    from lxml import etree
+
+    if isinstance(html, str):
+        html = html.encode("utf-8")
+
+    events = etree.iterparse(BytesIO(html), events=("start", "end"), html=True)
+    tables = []  # stack of open tables
+    count = -1
+    target = None
+    cells = []
+    spans = {}  # column -> [remaining rows, text]
+
+    for event, el in events:
+        tag = el.tag if isinstance(el.tag, str) else ""
+
+        if tag == "table":
+            if event == "start":
+                count += 1
+                tables.append(el)
+                if count == index:
+                    target = el
+            else:
+                tables.pop()
+                if el is target:
+                    break
+                if target is None:
+                    el.clear()
+
+        elif target is None or not tables or tables[-1] is not target:
+            continue
+
+        elif tag in ("td", "th") and event == "end":
+            text = " ".join("".join(el.itertext()).split())
+            rowspan = int(el.get("rowspan", 1) or 1)
+            colspan = int(el.get("colspan", 1) or 1)
+            cells.append((text, max(rowspan, 1), max(colspan, 1)))
+
+        elif tag == "tr" and event == "end":
+            row = []
+
+            for text, rowspan, colspan in cells:
+                while len(row) in spans:
+                    row.append(_take_span(spans, len(row)))
+
+                for _ in range(colspan):
+                    if rowspan > 1:
+                        spans[len(row)] = [rowspan - 1, text]
+                    row.append(text)
+
+            while len(row) in spans:
+                row.append(_take_span(spans, len(row)))
+
+            cells = []
+            el.clear()
+            yield row
+
+
+def _take_span(spans: Dict, c: int) -> str:
+    span = spans[c]
+    span[0] -= 1
+
+    if not span[0]:
+        del spans[c]
+
+    return span[1]
+
+
+def html_table_to_df(
+    html: Union[str, bytes],
+    index: int = 0,
+) -> pd.DataFrame:
+    """
+    return one table from html as a dataframe like pd.read_html would
+
+    only the html up to the end of the table is parsed ; short rows are
+    padded with empty cells to the width of the widest row
+    """
+
+    from pandas.io.parsers import TextParser
+
+    rows = list(html_table_rows(html, index))
+
+    if not rows:
+        raise ValueError(f"no table {index} found in html")
+
+    width = max(len(row) for row in rows)
+    rows = [row + [""] * (width - len(row)) for row in rows]
+
+    with TextParser(rows, header=None) as parser:
+        return parser.read()
+
+
 def html_to_serialized_data(
-    html: str,
+    html: Union[str, bytes],
+    index: int = 0,
     **other_data,
 ) -> List[Dict]:
     """
     helper function to return serialized data from html
+
+    values, types and padding are the same as for html_table_to_df
     """
 
-    return df_serialize_table(html_to_df(html)[0], **other_data)
+    return df_serialize_table(html_table_to_df(html, index), **other_data)
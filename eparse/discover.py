@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+
+"""
+excel file discovery
+
+walks directories with os.scandir (in parallel threads if requested)
+and yields matching files as soon as they are found, filtering by
+extension, include/exclude globs and file contents (see sniff)
+"""
+
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from fnmatch import fnmatch
+from itertools import chain
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+from zipfile import BadZipFile, ZipFile
+
+EXTENSIONS = (".xls", ".xlsx", ".xlsm", ".xlsb")
+
+ZIP_SIGNATURE = b"PK\x03\x04"
+OLE2_SIGNATURE = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+
+# one of these parts must be in a zip workbook (xlsx, xlsm or xlsb)
+WORKBOOK_PARTS = ("xl/workbook.xml", "xl/workbook.bin")
+
+
+def sniff(path: str) -> Optional[str]:
+    """
+    return the reason path is not a workbook, or None if it looks like one
+
+    only the file signature and (for zip files) the central directory
+    are read, so bad inputs are rejected without a parse attempt
+    """
+
+    if os.path.basename(path).startswith("~$"):
+        return "office lock file"
+
+    try:
+        with open(path, "rb") as f:
+            head = f.read(8)
+
+            if head.startswith(OLE2_SIGNATURE):
+                return None
+
+            if not head:
+                return "empty file"
+
+            if not head.startswith(ZIP_SIGNATURE):
+                return "no zip or ole2 signature"
+
+            try:
+                names = set(ZipFile(f).namelist())
+            except BadZipFile as e:
+                return f"corrupt zip file ({e})"
+
+    except OSError as e:
+        return f"unreadable ({e.strerror})"
+
+    if "[Content_Types].xml" not in names:
+        return "zip file without [Content_Types].xml"
+
+    if not names.intersection(WORKBOOK_PARTS):
+        return "zip file without a workbook part"
+
+    return None
+
+
+def is_workbook_name(name: str, extensions: Iterable[str] = EXTENSIONS) -> bool:
+    """
+    cheap filename filter for excel files (skips office lock files)
+    """
+
+    lock = os.path.basename(name).startswith("~$")
+
+    return name.lower().endswith(tuple(extensions)) and not lock
+
+
+def _matches(entry: str, patterns: Iterable[str]) -> bool:
+    name = os.path.basename(entry)
+    return any(fnmatch(name, p) or fnmatch(entry, p) for p in patterns)
+
+
+def list_dir(path: str) -> Tuple[List[str], List[str]]:
+    """
+    return (files, dirs) in path using only directory entry types
+    """
+
+    files, dirs = [], []
+
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        dirs.append(entry.path)
+                    elif entry.is_file():
+                        files.append(entry.path)
+                except OSError:
+                    continue
+    except OSError:
+        pass
+
+    return files, dirs
+
+
+def walk(
+    dirs: Iterable[str],
+    recursive: bool = False,
+    exclude: Iterable[str] = (),
+) -> Iterator[str]:
+    """
+    yield files in dirs, walking subdirectories breadth first
+
+    subdirectories matching an exclude glob are not walked
+    """
+
+    queue = deque(str(d) for d in dirs)
+
+    while queue:
+        files, subdirs = list_dir(queue.popleft())
+        yield from files
+
+        if recursive:
+            queue.extend(d for d in subdirs if not _matches(d, exclude))
+
+
+class Discovery:
+    """
+    lazily discover excel files in paths
+
+    files and dirs excluded by a glob are skipped (excluded dirs are
+    not walked) ; rejected files are passed to on_reject with a reason
+    and counted in rejected
+    """
+
+    def __init__(
+        self,
+        paths: Iterable[str],
+        recursive: bool = False,
+        extensions: Iterable[str] = EXTENSIONS,
+        include: Iterable[str] = (),
+        exclude: Iterable[str] = (),
+        magic: bool = True,
+        workers: int = 1,
+        on_reject: Optional[Callable[[Path, str], None]] = None,
+    ):
+        self.paths = [str(p) for p in paths]
+        self.recursive = recursive
+        self.extensions = tuple(e.lower() for e in extensions)
+        self.include = tuple(include)
+        self.exclude = tuple(exclude)
+        self.magic = magic
+        self.workers = workers
+        self.on_reject = on_reject
+        self.found = 0
+        self.rejected = 0
+
+    def _walk(self, dirs: List[str]) -> Iterator[str]:
+        """
+        yield files in dirs, walking subdirectories breadth first
+        """
+
+        return walk(dirs, self.recursive, self.exclude)
+
+    def _walk_parallel(self, dirs: List[str]) -> Iterator[str]:
+        """
+        yield files in dirs, listing up to workers directories at once
+        """
+
+        pool = ThreadPoolExecutor(max_workers=self.workers)
+        pending = {pool.submit(list_dir, d) for d in dirs}
+
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    files, subdirs = future.result()
+
+                    if self.recursive:
+                        pending |= {
+                            pool.submit(list_dir, d)
+                            for d in subdirs
+                            if not _matches(d, self.exclude)
+                        }
+
+                    yield from files
+        finally:
+            # stop walking if the consumer stops early (cancel_futures
+            # needs python 3.9)
+            for future in pending:
+                future.cancel()
+
+            pool.shutdown(wait=False)
+
+    def accept(self, path: str) -> bool:
+        """
+        True (and counted as found) if path passes all filters
+        """
+
+        if not path.lower().endswith(self.extensions):
+            return False
+
+        if self.include and not _matches(path, self.include):
+            return False
+
+        if _matches(path, self.exclude):
+            return False
+
+        reason = sniff(path) if self.magic else None
+
+        if reason is not None:
+            self._reject(path, reason)
+            return False
+
+        self.found += 1
+
+        return True
+
+    def _reject(self, path: str, reason: str):
+        self.rejected += 1
+
+        if self.on_reject is not None:
+            self.on_reject(Path(path), reason)
+
+    def __iter__(self) -> Iterator[Path]:
+        files = [p for p in self.paths if os.path.isfile(p)]
+        dirs = [p for p in self.paths if os.path.isdir(p)]
+
+        walk = self._walk_parallel if self.workers > 1 else self._walk
+
+        for path in chain(files, walk(dirs)):
+            if self.accept(path):
+                yield Path(path)
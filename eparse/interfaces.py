@@ -4,18 +4,27 @@
 excel parser interfaces
 """
 
+import csv
 import importlib
+import json
+import operator
 import re
+import secrets
+import sqlite3
+import sys
 from abc import abstractmethod
 from collections.abc import Iterable, Mapping
+from contextlib import nullcontext
 from datetime import datetime
+from functools import reduce
+from pathlib import Path
 from pprint import PrettyPrinter
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Sequence
 from uuid import uuid4
 
-import pandas as pd
 from peewee import (
     AutoField,
+    BooleanField,
     CharField,
     DatabaseProxy,
     DateTimeField,
@@ -23,14 +32,34 @@ from peewee import (
     Model,
     PostgresqlDatabase,
     SqliteDatabase,
+    Table,
+    chunked,
     fn,
 )
 
-from .core import html_to_serialized_data
+from .cache import QueryCache, cache_key
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# NOTE: pandas is imported where it is used so that importing this
+#       module (e.g. from the cli) stays fast
 
 DATABASE = DatabaseProxy()
 
 
+def _offset_rc(origin: str, row: int, column: int) -> str:
+    """
+    address of the cell at row and column of a table starting at origin
+    """
+
+    from openpyxl.utils.cell import coordinate_to_tuple, get_column_letter
+
+    r, c = coordinate_to_tuple(origin)
+
+    return f"{get_column_letter(c + column)}{r + row}"
+
+
 class ExcelParse(Model):
     """
     excel parse model
@@ -55,6 +84,8 @@ class ExcelParse(Model):
         return queryset with filters applied
         """
 
+        import pandas as pd
+
         query = cls.filter(**kwargs)
         return pd.DataFrame(query.dicts())
 
@@ -64,6 +95,8 @@ class ExcelParse(Model):
         return distinct values from column with aggregations
         """
 
+        import pandas as pd
+
         query = (
             cls.filter(**kwargs)
             .select(
@@ -76,11 +109,391 @@ class ExcelParse(Model):
         )
         return pd.DataFrame(query.dicts())
 
+    @classmethod
+    def get_tables(cls, *args, **kwargs):
+        """
+        return tables output in dedupe mode with their fingerprints
+        """
+
+        import pandas as pd
+
+        if not cls._meta.database.table_exists(ExcelParseTable._meta.table_name):
+            return pd.DataFrame()
+
+        return pd.DataFrame(ExcelParseTable.filter(**kwargs).dicts())
+
+    @classmethod
+    def get_cells(cls, *args, **kwargs):
+        """
+        return cells of tables output in dedupe mode, filtered by table
+
+        cells stored once for identical tables are returned for each of
+        them, with that table's name, sheet and f_name ; excel_RC is
+        where the cell is in that table (its origin plus row and column)
+        """
+
+        import pandas as pd
+
+        if not cls._meta.database.table_exists(ExcelParseCell._meta.table_name):
+            return pd.DataFrame()
+
+        cell = ExcelParseCell
+        table = ExcelParseTable
+        source = ExcelParseTable.alias()
+        query = (
+            cell.select(
+                cell.row,
+                cell.column,
+                cell.value,
+                cell.type,
+                cell.c_header,
+                cell.r_header,
+                cell.excel_RC,
+                table.name,
+                table.sheet,
+                table.f_name,
+                table.fingerprint,
+                table.excel_RC.alias("origin"),
+            )
+            .join(source, on=(cell.table_id == source.id))
+            .join(table, on=(table.fingerprint == source.fingerprint))
+            .order_by(table.id, cell.id)
+        )
+
+        if kwargs:
+            tables = ExcelParseTable.filter(**kwargs).select(ExcelParseTable.id)
+            query = query.where(table.id.in_(tables))
+
+        df = pd.DataFrame(query.dicts())
+
+        if df.empty:
+            return df
+
+        df["excel_RC"] = [
+            _offset_rc(*cell) for cell in zip(df["origin"], df["row"], df["column"])
+        ]
+
+        return df.drop(columns=["origin"])
+
+    @classmethod
+    def delete_tables(
+        cls,
+        data,
+        scope: str = "table",
+        replaced: Optional[set] = None,
+    ) -> int:
+        """
+        delete stored rows for the file(s) or table(s) found in data
+
+        keys in replaced are skipped and the keys deleted are added to it,
+        so tables sharing a name (e.g. two "ID" tables in one sheet) are
+        only replaced once per run
+        """
+
+        fields = ("f_name",) if scope == "file" else ("f_name", "sheet", "name")
+        keys = {tuple(str(d.get(k)) for k in fields) for d in data}
+        deleted = 0
+
+        if replaced is not None:
+            keys -= replaced
+            replaced |= keys
+
+        # keep cells other deduped tables still refer to
+        if cls._meta.database.table_exists(ExcelParseTable._meta.table_name):
+            for key in keys:
+                ExcelParseTable.release(fields, key)
+
+        # filter on a prefix of the (f_name, sheet, name) index
+        for key in keys:
+            where = [getattr(cls, k) == v for k, v in zip(fields, key)]
+            deleted += cls.delete().where(*where).execute()
+
+        return deleted
+
+    @classmethod
+    def dedupe(cls, batch_size: int = 1000, progress=None) -> int:
+        """
+        delete duplicate cells, keeping the latest row for each cell
+
+        a cell is identified by its table (f_name, sheet and name), its
+        position in the table and its excel_RC, since same-named tables
+        in a sheet only differ by where they are ; the ids to keep are
+        grouped once into a temporary table and older rows are deleted in
+        id ranges of batch_size, each in its own transaction to keep
+        locks short
+        """
+
+        db = cls._meta.database
+        last_id = cls.select(fn.MAX(cls.id)).scalar()
+
+        if last_id is None:
+            return 0
+
+        first_id = cls.select(fn.MIN(cls.id)).scalar()
+        name = f"excelparse_keep_{uuid4().hex[:8]}"
+        keep = Table(name, ("id",))
+        key = (cls.f_name, cls.sheet, cls.name, cls.row, cls.column, cls.excel_RC)
+        sql, params = (
+            cls.select(fn.MAX(cls.id).alias("id"))
+            .where(cls.id <= last_id)
+            .group_by(*key)
+            .sql()
+        )
+
+        db.execute_sql(f"CREATE TEMPORARY TABLE {name} AS {sql}", params)
+        db.execute_sql(f"CREATE INDEX {name}_id ON {name} (id)")
+
+        deleted = 0
+
+        try:
+            for start in range(first_id, last_id + 1, batch_size):
+                ids = (cls.id >= start) & (cls.id < start + batch_size)
+                kept = (keep.id >= start) & (keep.id < start + batch_size)
+                stale = ids & cls.id.not_in(keep.select(keep.id).where(kept))
+
+                with db.atomic():
+                    deleted += cls.delete().where(stale).execute()
+
+                if progress is not None:
+                    progress(deleted)
+
+        finally:
+            db.execute_sql(f"DROP TABLE {name}")
+
+        return deleted
+
+    class Meta:
+        database = DATABASE
+        indexes = ((("f_name", "sheet", "name"), False),)
+
+
+class ExcelParseTable(Model):
+    """
+    excel parse table model (dedupe mode)
+
+    one row per table output with fingerprints ; the cells of identical
+    tables (same fingerprint) are stored only once, in ExcelParseCell
+    with the id of the stored table
+    """
+
+    id = AutoField()
+    fingerprint = CharField(index=True)
+    name = CharField()
+    sheet = CharField()
+    f_name = CharField()
+    excel_RC = CharField()
+    stored = BooleanField(default=False)
+    timestamp = DateTimeField(default=datetime.utcnow)
+
+    @staticmethod
+    def split(data: Sequence[Mapping]) -> List[Sequence[Mapping]]:
+        """
+        split serialized cells into tables (each starts at row 0, column 0)
+        """
+
+        starts = [i for i, d in enumerate(data) if d["row"] == d["column"] == 0]
+        ends = starts[1:] + [len(data)]
+
+        return [data[i:j] for i, j in zip(starts, ends)]
+
+    @classmethod
+    def add(cls, data: Sequence[Mapping], fingerprints: Sequence[str]) -> List:
+        """
+        record the tables in data and return (table id, cells) to store
+        """
+
+        tables = cls.split(data)
+
+        if len(tables) != len(fingerprints):
+            raise ValueError(
+                f"{len(tables)} tables but {len(fingerprints)} fingerprints"
+            )
+
+        cells = []
+
+        for table, fingerprint in zip(tables, fingerprints):
+            first = table[0]
+            stored = cls.get_or_none(
+                (cls.fingerprint == fingerprint) & (cls.stored == True)  # noqa: E712
+            )
+
+            t = cls.create(
+                fingerprint=fingerprint,
+                name=str(first.get("name")),
+                sheet=str(first.get("sheet")),
+                f_name=str(first.get("f_name")),
+                excel_RC=first["excel_RC"],
+                stored=stored is None,
+            )
+
+            if stored is None:
+                cells.append((t.id, table))
+
+        return cells
+
+    @classmethod
+    def release(cls, fields: Sequence[str], key: Sequence[str]):
+        """
+        delete the tables matching key, moving stored cells to a table left
+        """
+
+        match = [getattr(cls, k) == v for k, v in zip(fields, key)]
+
+        for t in cls.select().where(*match, cls.stored == True):  # noqa: E712
+            heir = (
+                cls.select()
+                .where(cls.fingerprint == t.fingerprint, ~reduce(operator.and_, match))
+                .order_by(cls.id)
+                .first()
+            )
+
+            cells = ExcelParseCell.table_id == t.id
+
+            if heir is None:
+                ExcelParseCell.delete().where(cells).execute()
+                continue
+
+            (
+                ExcelParseCell.update(
+                    f_name=heir.f_name,
+                    sheet=heir.sheet,
+                    name=heir.name,
+                    table_id=heir.id,
+                )
+                .where(cells)
+                .execute()
+            )
+            cls.update(stored=True).where(cls.id == heir.id).execute()
+
+        cls.delete().where(*match).execute()
+
     class Meta:
         database = DATABASE
         indexes = ((("f_name", "sheet", "name"), False),)
 
 
+class ExcelParseCell(ExcelParse):
+    """
+    excel parse cell model (dedupe mode)
+
+    cells of the tables stored by ExcelParseTable, which they link to
+    by table_id ; kept apart from excelparse so its schema is unchanged
+    """
+
+    table_id = IntegerField(index=True)
+
+
+class ExcelParseFile(Model):
+    """
+    excel parse source file model
+
+    rows only keep the file name, so the full path of every file stored
+    under each f_name is recorded here to tell files with the same name
+    (e.g. in other directories) apart when replacing
+    """
+
+    f_name = CharField(index=True)
+    path = CharField()
+
+    @classmethod
+    def claim(cls, f_names: Iterable, path: str, replace: bool = False):
+        """
+        record that path is stored under f_names
+
+        with replace, refuse (ValueError) when another file is stored
+        under one of the names, since its rows would be deleted too
+        """
+
+        for f_name in f_names:
+            if replace:
+                other = cls.get_or_none((cls.f_name == f_name) & (cls.path != path))
+
+                if other is not None:
+                    raise ValueError(
+                        f"not replacing {f_name} - {other.path} is stored under "
+                        f"the same name and would be replaced too"
+                    )
+
+            cls.insert(f_name=f_name, path=path).on_conflict_ignore().execute()
+
+    class Meta:
+        database = DATABASE
+        indexes = ((("f_name", "path"), True),)
+
+
+class ExcelParseMeta(Model):
+    """
+    excel parse meta data model (e.g. data version counters)
+    """
+
+    key = CharField(primary_key=True)
+    value = IntegerField(default=0)
+
+    @classmethod
+    def get_value(cls, key: str) -> int:
+        """
+        return a counter value or 0 if it has never been set
+        """
+
+        if not cls._meta.database.table_exists(cls._meta.table_name):
+            return 0
+
+        row = cls.get_or_none(cls.key == key)
+        return 0 if row is None else row.value
+
+    @classmethod
+    def database_id(cls, create: bool = False) -> Optional[int]:
+        """
+        random id of the database, set when eparse first writes to it
+
+        a database deleted and created again (e.g. at the same path) gets
+        a new id, so its cached query results are not mistaken for the
+        old ones ; returns None for databases without an id
+        """
+
+        if create:
+            cls._meta.database.create_tables([cls])
+            value = secrets.randbits(31)
+            cls.insert(key="database_id", value=value).on_conflict_ignore().execute()
+        elif not cls._meta.database.table_exists(cls._meta.table_name):
+            return None
+
+        row = cls.get_or_none(cls.key == "database_id")
+        return None if row is None else row.value
+
+    @classmethod
+    def bump(cls, key: str):
+        """
+        atomically increment a counter
+        """
+
+        cls._meta.database.create_tables([cls])
+        (
+            cls.insert(key=key, value=1)
+            .on_conflict(
+                conflict_target=[cls.key],
+                update={cls.value: cls.value + 1},
+            )
+            .execute()
+        )
+
+    class Meta:
+        database = DATABASE
+
+
+class ExcelParseMigration(Model):
+    """
+    excel parse applied migrations model
+    """
+
+    name = CharField(primary_key=True)
+    step = IntegerField(default=0)
+    applied = DateTimeField(null=True)
+
+    class Meta:
+        database = DATABASE
+
+
 class BaseInterface:
     """
     base interface class
@@ -110,13 +523,20 @@ class BaseInterface:
         pass
 
     @abstractmethod
-    def output(self, data: pd.DataFrame, obj: Dict) -> pd.DataFrame:
+    def output(self, data: "pd.DataFrame", obj: Dict) -> "pd.DataFrame":
         """
         to_X override with output handler
         """
 
         pass
 
+    def start_file(self, f: Optional[str] = None):
+        """
+        called with the path of each file before its tables are output
+        """
+
+        pass
+
     @abstractmethod
     def migrate(self, migration: str):
         """
@@ -141,6 +561,8 @@ class NullInterface(BaseInterface):
     """
 
     def input(self):
+        import pandas as pd
+
         return pd.DataFrame()
 
     def output(self, *args, **kwargs):
@@ -156,20 +578,159 @@ class StdoutInterface(BaseInterface):
     """
 
     def input(self):
+        import pandas as pd
+
         return pd.DataFrame()
 
     def output(self, data, *args, **kwargs):
+        # compact records print as the dicts they stand for
+        if isinstance(data, list):
+            data = [dict(d) if isinstance(d, Mapping) else d for d in data]
+
         PrettyPrinter().pprint(data)
 
     def migrate(self, *args, **kwargs):
         pass
 
 
+def _json_default(o):
+    """
+    encode values json does not know about (timestamps, numpy scalars)
+    """
+
+    if hasattr(o, "isoformat"):
+        return o.isoformat()
+    if hasattr(o, "item"):
+        return o.item()
+
+    return str(o)
+
+
+class StreamInterface(StdoutInterface):
+    """
+    base interface for streaming records to stdout or a file
+    """
+
+    chunk_size = 1000
+
+    @staticmethod
+    def records(data) -> Iterator[Dict]:
+        """
+        yield records from a dataframe, a record or a list of records
+        """
+
+        import pandas as pd
+
+        if isinstance(data, pd.DataFrame):
+            data = data.astype(object).where(data.notna(), None)
+            cols = [str(c) for c in data.columns]
+            for row in data.itertuples(index=False, name=None):
+                yield dict(zip(cols, row))
+        elif isinstance(data, Mapping):
+            yield data
+        elif data is not None:
+            yield from data
+
+    def open(self):
+        """
+        return the output stream, stdout unless a path is given in the uri
+        """
+
+        if self.name:
+            return open(self.name, "a", newline="", encoding="utf-8")
+
+        return nullcontext(sys.stdout)
+
+    def output(self, data, *args, **kwargs):
+        with self.open() as stream:
+            self.write(stream, self.records(data))
+            stream.flush()
+
+    @abstractmethod
+    def write(self, stream, records: Iterator[Dict]):
+        """
+        override with record writer
+        """
+
+        pass
+
+
+class JsonlInterface(StreamInterface):
+    """
+    json lines interface
+    """
+
+    encode = json.JSONEncoder(
+        default=_json_default,
+        ensure_ascii=False,
+        check_circular=False,
+        separators=(",", ":"),
+    ).encode
+
+    def write(self, stream, records):
+        chunk = []
+
+        for record in records:
+            # compact records (see core.CellRecord) are encoded as dicts
+            if not isinstance(record, dict):
+                record = dict(record)
+
+            chunk.append(self.encode(record))
+
+            if len(chunk) >= self.chunk_size:
+                stream.write("\n".join(chunk) + "\n")
+                chunk = []
+
+        if chunk:
+            stream.write("\n".join(chunk) + "\n")
+
+
+class CsvInterface(StreamInterface):
+    """
+    csv interface
+    """
+
+    fieldnames = None
+
+    def write(self, stream, records):
+        writer = None
+        chunk = []
+
+        for record in records:
+            if writer is None:
+                fieldnames = list(record.keys())
+                writer = csv.DictWriter(
+                    stream,
+                    fieldnames=fieldnames,
+                    extrasaction="ignore",
+                )
+
+                # repeat the header only when the record layout changes
+                if fieldnames != self.fieldnames:
+                    writer.writeheader()
+                    self.fieldnames = fieldnames
+
+            chunk.append(record)
+
+            if len(chunk) >= self.chunk_size:
+                writer.writerows(chunk)
+                chunk = []
+
+        if chunk:
+            writer.writerows(chunk)
+
+
 class BaseDatabaseInterface(BaseInterface):
     """
     base database interface
     """
 
+    cache: Optional[QueryCache] = None
+    replace: Optional[str] = None
+    replaced: Optional[set] = None
+    path: Optional[str] = None
+    batch_size = 1000
+
     @abstractmethod
     def initialize(self, *args, **kwargs):
         """
@@ -178,6 +739,11 @@ class BaseDatabaseInterface(BaseInterface):
 
         pass
 
+    def start_file(self, f: Optional[str] = None):
+        # a file parsed again (e.g. when watching) replaces its rows again
+        self.replaced = set()
+        self.path = None if f is None else str(Path(f).resolve())
+
     def input(self, method, **kwargs):
         m = getattr(self.Model, method, None)
 
@@ -188,11 +754,30 @@ class BaseDatabaseInterface(BaseInterface):
             kwargs["column"] = re.match(patt, method).group("column")
 
         self.initialize(DATABASE)
-        DATABASE.connect()
+        DATABASE.connect(reuse_if_open=True)
 
-        return m(**kwargs)
+        if self.cache is None:
+            return m(**kwargs)
+
+        key = cache_key(self.get_database_id(), method, kwargs, self.data_version)
+        result = self.cache.get(key)
+
+        if result is None:
+            result = m(**kwargs)
+            self.cache.set(key, result)
+
+        return result
+
+    def output(
+        self, data, *args, fingerprints: Optional[Sequence[str]] = None, **kwargs
+    ):
+        """
+        store serialized data
+
+        pass the fingerprint of each table in data (see core.df_fingerprint)
+        to store identical tables once (see ExcelParseTable)
+        """
 
-    def output(self, data, *args, **kwargs):
         # skip empty data
         if hasattr(data, "empty") and data.empty:
             return
@@ -207,16 +792,62 @@ class BaseDatabaseInterface(BaseInterface):
             raise ValueError("bad data - did you serialize it first?")
 
         self.initialize(DATABASE)
-        DATABASE.connect()
+        DATABASE.connect(reuse_if_open=True)
         DATABASE.create_tables([self.Model])
+        ExcelParseMeta.database_id(create=True)
+
+        if fingerprints is not None:
+            DATABASE.create_tables([ExcelParseTable, ExcelParseCell])
 
-        # insert data into Model
+        if self.path is not None:
+            DATABASE.create_tables([ExcelParseFile])
+
+        # insert data into Model, replacing existing rows if requested
         with DATABASE.atomic():
-            self.Model.insert_many(data).execute()
+            if self.path is not None:
+                f_names = {str(d.get("f_name")) for d in data}
+                ExcelParseFile.claim(f_names, self.path, self.replace is not None)
+
+            if self.replace is not None:
+                if self.replaced is None:
+                    self.replaced = set()
+
+                self.Model.delete_tables(data, self.replace, self.replaced)
+
+            model = self.Model
+
+            # deduped cells are stored with the id of their table
+            if fingerprints is not None:
+                tables = ExcelParseTable.add(data, fingerprints)
+                data = (dict(c, table_id=i) for i, cells in tables for c in cells)
+                model = ExcelParseCell
+
+            for batch in chunked(data, self.batch_size):
+                model.insert_many(batch).execute()
+
+            ExcelParseMeta.bump("data_version")
 
         # DATABASE.close()
 
-    def migrate(self, migration):
+    def dedupe(self, progress=None) -> int:
+        """
+        remove duplicate rows left behind by repeated ingests
+        """
+
+        self.initialize(DATABASE)
+        DATABASE.connect(reuse_if_open=True)
+
+        if not DATABASE.table_exists(self.Model._meta.table_name):
+            return 0
+
+        deleted = self.Model.dedupe(self.batch_size, progress)
+
+        if deleted:
+            ExcelParseMeta.bump("data_version")
+
+        return deleted
+
+    def migrate(self, migration, progress=None) -> bool:
         try:
             m = importlib.import_module("eparse.migrations")
             migration_fcn = getattr(m, migration)
@@ -225,23 +856,86 @@ class BaseDatabaseInterface(BaseInterface):
             raise AttributeError(msg)
 
         self.initialize(DATABASE)
-        DATABASE.connect()
-        migration_fcn(self.Model)
+        DATABASE.connect(reuse_if_open=True)
+        applied = migration_fcn(self.Model, progress)
+
+        if applied:
+            ExcelParseMeta.bump("data_version")
+
+        return applied
+
+    @property
+    def data_version(self) -> int:
+        """
+        current data version of the connected database
+        """
+
+        return ExcelParseMeta.get_value("data_version")
+
+    def get_database_id(self) -> str:
+        """
+        identify the database and table this interface reads from
+        """
+
+        table = getattr(getattr(self.Model, "_meta", None), "table_name", "")
+        location = f"{self.endpoint}://{self.host}:{self.port}/{self.name}"
+        return f"{location}#{table}@{ExcelParseMeta.database_id()}"
 
 
 class Sqlite3Interface(BaseDatabaseInterface):
     """
     sqlite3 interface
+
+    use memory=True or a :memory: name for a shared-cache in-memory
+    database that lives as long as the interface
     """
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, memory: bool = False, **kwargs):
         super().__init__(*args, **kwargs)
 
-        if not self.name:
+        self._database = None
+        self._keepalive = None
+
+        if memory or self.name == ":memory:":
+            self.name = f"file:eparse-{uuid4()}?mode=memory&cache=shared"
+            # the in-memory database is dropped with its last connection
+            self._keepalive = sqlite3.connect(
+                self.name,
+                uri=True,
+                check_same_thread=False,
+            )
+        elif not self.name:
             self.name = f".files/{uuid4()}.db"
 
+    @property
+    def memory(self) -> bool:
+        return self._keepalive is not None
+
     def initialize(self, db):
-        db.initialize(SqliteDatabase(self.name))
+        if self._database is None:
+            self._database = SqliteDatabase(self.name, uri=self.memory)
+
+        db.initialize(self._database)
+
+    def get_database_id(self) -> str:
+        """
+        identify the database file (by absolute path) and table
+        """
+
+        table = getattr(getattr(self.Model, "_meta", None), "table_name", "")
+        database_id = ExcelParseMeta.database_id()
+
+        if self.memory:
+            return f"{self.name}#{table}@{database_id}"
+
+        path = Path(self.name).resolve()
+
+        # databases eparse never wrote to have no id, tell files apart
+        if database_id is None and path.exists():
+            st = path.stat()
+            database_id = f"{st.st_ino}:{st.st_mtime_ns}"
+
+        return f"sqlite3://{path}#{table}@{database_id}"
 
 
 class PostgresInterface(BaseDatabaseInterface):
@@ -264,13 +958,32 @@ class PostgresInterface(BaseDatabaseInterface):
 class HtmlInterface(Sqlite3Interface):
     """
     html data interface using sqlite3
+
+    the parsed table is kept on .df ; use store=False to skip loading
+    it into the database when only the dataframe is needed, and meta to
+    set serialized fields such as name, sheet and f_name
     """
 
-    def __init__(self, *args, html: Optional[str] = None, **kwargs):
+    df: Optional["pd.DataFrame"] = None
+
+    def __init__(
+        self,
+        *args,
+        html: Optional[str] = None,
+        store: bool = True,
+        meta: Optional[Dict] = None,
+        **kwargs,
+    ):
         super().__init__(*args, **kwargs)
 
         if html is not None:
-            self.output(html_to_serialized_data(html))
+            from .core import df_serialize_records, html_table_to_df
+
+            self.df = html_table_to_df(html)
+
+            if store:
+                meta = {"name": "", "sheet": "", "f_name": "", **(meta or {})}
+                self.output(df_serialize_records(self.df, **meta))
 
 
 def i_factory(uri, Model=None, **kwargs):
@@ -282,6 +995,10 @@ def i_factory(uri, Model=None, **kwargs):
         return NullInterface(uri, **kwargs)
     elif uri.startswith("stdout"):
         return StdoutInterface(uri, **kwargs)
+    elif uri.startswith("jsonl"):
+        return JsonlInterface(uri, **kwargs)
+    elif uri.startswith("csv"):
+        return CsvInterface(uri, **kwargs)
     elif uri.startswith("sqlite3"):
         return Sqlite3Interface(uri, Model, **kwargs)
     elif uri.startswith("postgres"):
@@ -2,63 +2,220 @@
 
 """
 excel parser database migrations
+
+migrations are made of idempotent steps that run outside of one long
+transaction ; completed steps are recorded in a version table so an
+interrupted migration resumes where it stopped and a finished one is
+not applied twice
 """
 
-from playhouse.migrate import SchemaMigrator, migrate
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Optional, Sequence
+
+from peewee import PostgresqlDatabase, fn
+from playhouse.migrate import SchemaMigrator, make_index_name, migrate
+
+from .interfaces import ExcelParseMigration
+
+Progress = Optional[Callable[[str, int, int], None]]
+
+
+@contextmanager
+def _autocommit(database):
+    """
+    run statements outside of a transaction block (postgres)
+    """
+
+    conn = database.connection()
+    autocommit = conn.autocommit
+    conn.autocommit = True
+
+    try:
+        yield
+    finally:
+        conn.autocommit = autocommit
 
 
-def migration_000102_000200(model):
+def add_column(table: str, column: str, field_name: str):
     """
-    database migration from 0.1.2 to 0.2.0
+    step that adds a nullable column if it does not exist yet
+    """
+
+    def step(model, database, progress: Progress = None):
+        if column in [c.name for c in database.get_columns(table)]:
+            return
+
+        migrator = SchemaMigrator.from_database(database)
+        field = getattr(model, field_name).clone()
+        migrate(migrator.alter_add_column(table, column, field))
+
+    return step
+
+
+def backfill(
+    table: str,
+    column: str,
+    value: Callable,
+    batch_size: int = 10_000,
+):
     """
+    step that sets NULL values of a column in id-ranged batches
 
-    database = model._meta.database.obj
-    timestamp_field = model.timestamp
-
-    migrator = SchemaMigrator.from_database(database)
-
-    with database.atomic():
-        migrate(
-            # table column_name new_field
-            migrator.add_column(
-                "excelparse",
-                "timestamp",
-                timestamp_field,
-            ),
-            # table column_name(s) unique
-            migrator.add_index(
-                "excelparse",
-                ("c_header",),
-                False,
-            ),
-            migrator.add_index(
-                "excelparse",
-                ("r_header",),
-                False,
-            ),
-            migrator.add_index(
-                "excelparse",
-                ("excel_RC",),
-                False,
-            ),
-            migrator.add_index(
-                "excelparse",
-                ("name",),
-                False,
-            ),
-            migrator.add_index(
-                "excelparse",
-                ("sheet",),
-                False,
-            ),
-            migrator.add_index(
-                "excelparse",
-                ("f_name",),
-                False,
-            ),
-            migrator.add_index(
-                "excelparse",
-                ("f_name", "sheet", "name"),
-                False,
-            ),
+    each batch commits on its own and only NULL rows are touched, so the
+    step can be interrupted and re-run at any time
+    """
+
+    def step(model, database, progress: Progress = None):
+        field = getattr(model, column)
+        pending = model.select(fn.MIN(model.id), fn.MAX(model.id)).where(
+            field.is_null()
         )
+        start, end = pending.scalar(as_tuple=True)
+
+        if start is None:
+            return
+
+        v = value()
+        total = end - start + 1
+
+        for lo in range(start, end + 1, batch_size):
+            hi = lo + batch_size
+            with database.atomic():
+                (
+                    model.update({field: v})
+                    .where(model.id >= lo, model.id < hi, field.is_null())
+                    .execute()
+                )
+
+            if progress is not None:
+                progress(f"backfill {table}.{column}", min(hi, end + 1) - start, total)
+
+    return step
+
+
+def add_not_null(table: str, column: str):
+    """
+    step that adds a NOT NULL constraint (postgres only)
+
+    a NOT VALID check constraint is added first (no scan), validated
+    without blocking reads or writes and then SET NOT NULL reuses it
+    instead of scanning the table under an exclusive lock (postgres
+    12+) ; sqlite cannot alter a column in place and would rebuild the
+    whole table, so the column is left nullable there
+    """
+
+    def step(model, database, progress: Progress = None):
+        if not isinstance(database, PostgresqlDatabase):
+            return
+
+        check = f"{table}_{column}_not_null"
+        exists = database.execute_sql(
+            "SELECT 1 FROM pg_constraint WHERE conname = %s", (check,)
+        ).fetchone()
+
+        if not exists:
+            database.execute_sql(
+                f'ALTER TABLE "{table}" ADD CONSTRAINT "{check}" '
+                f'CHECK ("{column}" IS NOT NULL) NOT VALID'
+            )
+
+        database.execute_sql(f'ALTER TABLE "{table}" VALIDATE CONSTRAINT "{check}"')
+        database.execute_sql(
+            f'ALTER TABLE "{table}" ALTER COLUMN "{column}" SET NOT NULL'
+        )
+        database.execute_sql(f'ALTER TABLE "{table}" DROP CONSTRAINT "{check}"')
+
+    return step
+
+
+def add_index(table: str, columns: Sequence[str], unique: bool = False):
+    """
+    step that builds an index, concurrently on postgres
+    """
+
+    def step(model, database, progress: Progress = None):
+        name = make_index_name(table, columns)
+        cols = ", ".join(f'"{c}"' for c in columns)
+        u = "UNIQUE " if unique else ""
+
+        if not isinstance(database, PostgresqlDatabase):
+            sql = f'CREATE {u}INDEX IF NOT EXISTS "{name}" ON "{table}" ({cols})'
+            database.execute_sql(sql)
+            return
+
+        with _autocommit(database):
+            # an interrupted concurrent build leaves an invalid index behind
+            invalid = database.execute_sql(
+                "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                "WHERE c.relname = %s AND NOT i.indisvalid",
+                (name,),
+            ).fetchone()
+
+            if invalid:
+                database.execute_sql(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+            database.execute_sql(
+                f'CREATE {u}INDEX CONCURRENTLY IF NOT EXISTS "{name}" '
+                f'ON "{table}" ({cols})'
+            )
+
+    return step
+
+
+class Migration:
+    """
+    resumable migration made of idempotent steps
+    """
+
+    def __init__(self, name: str, steps: Sequence[Callable]):
+        self.name = name
+        self.steps = steps
+
+    def __call__(self, model, progress: Progress = None) -> bool:
+        """
+        apply remaining steps and return False if already applied
+        """
+
+        database = model._meta.database.obj
+        database.create_tables([ExcelParseMigration])
+
+        record, _ = ExcelParseMigration.get_or_create(name=self.name)
+
+        if record.applied is not None:
+            return False
+
+        for i, step in enumerate(self.steps):
+            if i < record.step:
+                continue
+
+            step(model, database, progress)
+
+            record.step = i + 1
+            record.save()
+
+            if progress is not None:
+                progress(self.name, record.step, len(self.steps))
+
+        record.applied = datetime.utcnow()
+        record.save()
+
+        return True
+
+
+# database migration from 0.1.2 to 0.2.0
+migration_000102_000200 = Migration(
+    "migration_000102_000200",
+    [
+        add_column("excelparse", "timestamp", "timestamp"),
+        backfill("excelparse", "timestamp", datetime.utcnow),
+        add_not_null("excelparse", "timestamp"),
+        add_index("excelparse", ("c_header",)),
+        add_index("excelparse", ("r_header",)),
+        add_index("excelparse", ("excel_RC",)),
+        add_index("excelparse", ("name",)),
+        add_index("excelparse", ("sheet",)),
+        add_index("excelparse", ("f_name",)),
+        add_index("excelparse", ("f_name", "sheet", "name")),
+    ],
+)
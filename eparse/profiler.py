@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+
+"""
+excel parser per-file profiler
+"""
+
+import cProfile
+import hashlib
+import json
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from time import perf_counter
+from typing import Dict, List, Optional
+
+from .stats import Stats
+
+
+class Profiler:
+    """
+    cProfile each file into a directory and keep the slowest files
+
+    profiles are written as <file name>.<path hash>.prof and can be read
+    with pstats or snakeviz ; sheet shapes and candidate table counts
+    come from the sheets notes of the given Stats object
+    """
+
+    def __init__(self, path: str, top: int = 10, stats: Optional[Stats] = None):
+        self.path = Path(path)
+        self.top = top
+        self.stats = stats
+        self.results = []
+
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def _file(self, f) -> Path:
+        digest = hashlib.sha1(str(f).encode("utf-8")).hexdigest()[:8]
+        return self.path / f"{Path(f).name}.{digest}.prof"
+
+    @contextmanager
+    def profile(self, f):
+        """
+        profile the processing of file f
+        """
+
+        profile = cProfile.Profile()
+        start = perf_counter()
+        profile.enable()
+
+        try:
+            yield profile
+        finally:
+            profile.disable()
+            elapsed = perf_counter() - start
+            out = self._file(f)
+            profile.dump_stats(out)
+
+            sheets = []
+            if self.stats is not None:
+                # stats are keyed by the full path of the file
+                sheets = self.stats.notes[str(f)]["sheets"]
+
+            self.results.append(
+                {
+                    "file": str(f),
+                    "time": elapsed,
+                    "profile": str(out),
+                    "sheets": [
+                        {"sheet": str(s), "shape": list(shape), "candidates": n}
+                        for s, shape, n in sheets
+                    ],
+                }
+            )
+
+    def slowest(self) -> List[Dict]:
+        """
+        return the slowest files, slowest first
+        """
+
+        return sorted(self.results, key=lambda r: r["time"], reverse=True)[: self.top]
+
+    def write_report(self) -> Path:
+        """
+        write the slowest files to slowest.json in the profile directory
+        """
+
+        out = self.path / "slowest.json"
+        out.write_text(json.dumps(self.slowest(), indent=2))
+
+        return out
+
+
+class NullProfiler(Profiler):
+    """
+    no-op profiler used when profiling is disabled
+    """
+
+    _null = nullcontext()
+
+    def __init__(self):
+        self.path = None
+        self.top = 0
+        self.stats = None
+        self.results = []
+
+    def profile(self, f):
+        return self._null
+
+
+NULL_PROFILER = NullProfiler()
@@ -0,0 +1,378 @@
+# -*- coding: utf-8 -*-
+
+"""
+excel parser server
+
+a long-running process that keeps pandas imported, interfaces connected
+and query results cached in a pool of warm workers, and exposes scan,
+parse and query as json endpoints over localhost http or a unix socket
+"""
+
+import json
+import os
+import socket
+from concurrent.futures import ProcessPoolExecutor
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from socketserver import ThreadingMixIn, UnixStreamServer
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+from .cache import QueryCache
+from .worker import warm
+
+DEFAULT_ADDRESS = "http://127.0.0.1:8765"
+
+# per-worker state
+_interfaces = {}
+_cache = QueryCache()
+
+
+def get_interface(uri: str):
+    """
+    return a pooled interface for uri
+    """
+
+    from .interfaces import ExcelParse, i_factory
+
+    if uri not in _interfaces:
+        _interfaces[uri] = i_factory(uri, ExcelParse)
+
+    return _interfaces[uri]
+
+
+def _expand(files: Iterable[str], recursive: bool = False) -> Iterable[Path]:
+    from .discover import Discovery
+
+    return Discovery(files, recursive)
+
+
+def scan(
+    files: List[str],
+    sheet: Optional[str] = None,
+    tables: bool = False,
+    loose: bool = True,
+    recursive: bool = False,
+) -> Dict:
+    """
+    describe the sheets (and optionally count tables) of excel files
+    """
+
+    import pandas as pd
+
+    from .core import df_find_tables
+
+    result = []
+
+    for f in _expand(files, recursive):
+        item = {"file": str(f), "size": f.stat().st_size}
+
+        try:
+            e_file = pd.read_excel(f, sheet_name=sheet, header=None, index_col=None)
+        except Exception as e:
+            result.append({**item, "error": str(e)})
+            continue
+
+        if not isinstance(e_file, dict):
+            e_file = {sheet: e_file}
+
+        item["sheets"] = {s: list(df.shape) for s, df in e_file.items()}
+
+        if tables:
+            item["tables"] = {
+                s: len(df_find_tables(df, loose)) for s, df in e_file.items()
+            }
+
+        result.append(item)
+
+    return {"files": result}
+
+
+def parse(
+    files: List[str],
+    output: str = "null:///",
+    sheet: Iterable[str] = (),
+    table: Optional[str] = None,
+    nacount: int = 0,
+    exclude_nested: bool = False,
+    serialize: bool = False,
+    replace: Optional[str] = None,
+    dedupe_tables: bool = False,
+    loose: bool = True,
+    recursive: bool = False,
+    include_data: bool = False,
+    stats: bool = False,
+    checkpoint: Optional[str] = None,
+    resume: bool = False,
+) -> Dict:
+    """
+    parse tables from excel files and send them to output
+
+    set include_data (with serialize) to also return serialized tables,
+    stats to return per-file stats and checkpoint (a path) to record
+    progress there, skipping files and tables already in it with resume
+    """
+
+    from .checkpoint import NULL_CHECKPOINT, Checkpoint
+    from .core import get_df_from_file, output_tables
+    from .stats import NULL_STATS, Stats
+
+    o = get_interface(output)
+    o.replace = replace
+    s_obj = Stats() if stats else NULL_STATS
+    c_obj = NULL_CHECKPOINT
+    result = []
+
+    if checkpoint is not None:
+        c_obj = Checkpoint(checkpoint, resume)
+
+    for f in _expand(files, recursive):
+        item = {"file": str(f), "tables": []}
+
+        if c_obj.done(f):
+            result.append({**item, "done": True})
+            continue
+
+        s_obj.start_file(str(f), f.stat().st_size)
+
+        try:
+            tables = get_df_from_file(
+                f,
+                loose,
+                sheet,
+                table,
+                nacount + 1,
+                nacount + 1,
+                exclude_nested=exclude_nested,
+                stats=s_obj,
+            )
+
+            for df, data, excel_RC, name, s in output_tables(
+                f,
+                tables,
+                o,
+                serialize=serialize,
+                replace=replace,
+                dedupe=dedupe_tables,
+                stats=s_obj,
+                checkpoint=c_obj,
+            ):
+                t = {
+                    "name": name,
+                    "sheet": s,
+                    "excel_RC": excel_RC,
+                    "shape": list(df.shape),
+                }
+
+                if serialize and include_data:
+                    t["data"] = [dict(r) for r in data]
+
+                item["tables"].append(t)
+
+        except Exception as e:
+            item["error"] = str(e)
+
+        if stats:
+            item["stats"] = s_obj.summary(str(f))
+
+        result.append(item)
+
+    c_obj.close()
+
+    return {"files": result}
+
+
+def query(
+    input: str,
+    method: str = "get_queryset",
+    filters: Optional[Dict] = None,
+    cache: bool = True,
+) -> Dict:
+    """
+    query eparse output and return records
+    """
+
+    i = get_interface(input)
+    i.cache = _cache if cache else None
+    data = i.input(method, **(filters or {}))
+
+    return {"records": data.to_dict("records")}
+
+
+class Handler(BaseHTTPRequestHandler):
+    """
+    json request handler dispatching to the worker pool
+    """
+
+    routes = {"/scan": scan, "/parse": parse, "/query": query}
+
+    def _send(self, status: int, body: Dict):
+        from .interfaces import _json_default
+
+        payload = json.dumps(body, default=_json_default).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if self.path == "/health":
+            return self._send(200, {"status": "ok", "pid": os.getpid()})
+
+        self._send(404, {"error": f"unknown endpoint {self.path}"})
+
+    def do_POST(self):
+        # always consume the body so the client can finish sending it
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = self.rfile.read(length)
+        except Exception as e:
+            return self._send(400, {"error": f"bad request - {e}"})
+
+        fcn = self.routes.get(self.path)
+
+        if fcn is None:
+            return self._send(404, {"error": f"unknown endpoint {self.path}"})
+
+        try:
+            params = json.loads(body or b"{}")
+            assert isinstance(params, dict)
+        except Exception as e:
+            return self._send(400, {"error": f"bad request - {e}"})
+
+        try:
+            result = self.server.executor.submit(fcn, **params).result()
+        except Exception as e:
+            return self._send(500, {"error": f"{type(e).__name__} - {e}"})
+
+        self._send(200, result)
+
+    def address_string(self) -> str:
+        # unix socket clients have no address
+        return str(self.client_address[0]) if self.client_address else "unix"
+
+    def log_message(self, *args):
+        if self.server.verbose:
+            super().log_message(*args)
+
+
+class UnixHTTPServer(ThreadingMixIn, UnixStreamServer):
+    """
+    threading http server on a unix socket
+    """
+
+    daemon_threads = True
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+        super().server_bind()
+        self.server_name = "localhost"
+        self.server_port = 0
+
+
+def make_server(
+    address: str = DEFAULT_ADDRESS,
+    workers: int = 2,
+    verbose: bool = False,
+):
+    """
+    return a server for http://host:port or unix:///path addresses
+    """
+
+    url = urlparse(address)
+
+    if url.scheme == "unix":
+        server = UnixHTTPServer(url.path, Handler)
+    elif url.scheme == "http":
+        server = ThreadingHTTPServer((url.hostname, url.port or 0), Handler)
+    else:
+        raise ValueError(f"{address} is not a recognized address")
+
+    server.executor = ProcessPoolExecutor(max_workers=workers, initializer=warm)
+    server.verbose = verbose
+
+    return server
+
+
+def serve(address: str = DEFAULT_ADDRESS, workers: int = 2, verbose: bool = False):
+    """
+    run a server until interrupted
+    """
+
+    server = make_server(address, workers, verbose)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.executor.shutdown()
+
+
+class UnixHTTPConnection(HTTPConnection):
+    """
+    http connection over a unix socket
+    """
+
+    def __init__(self, path: str, timeout: Optional[float] = None):
+        super().__init__("localhost", timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+class Client:
+    """
+    small client for an eparse server
+    """
+
+    def __init__(self, address: str = DEFAULT_ADDRESS, timeout: Optional[float] = None):
+        self.url = urlparse(address)
+        self.timeout = timeout
+
+    def _connect(self) -> HTTPConnection:
+        if self.url.scheme == "unix":
+            return UnixHTTPConnection(self.url.path, self.timeout)
+
+        return HTTPConnection(self.url.hostname, self.url.port, timeout=self.timeout)
+
+    def request(self, path: str, verb: str = "POST", **params) -> Dict:
+        """
+        send a request and return the decoded response
+        """
+
+        conn = self._connect()
+
+        try:
+            body = json.dumps(params) if verb == "POST" else None
+            headers = {"Content-Type": "application/json"}
+            conn.request(verb, path, body=body, headers=headers)
+            response = conn.getresponse()
+            data = json.loads(response.read() or b"{}")
+        finally:
+            conn.close()
+
+        if response.status != 200:
+            raise RuntimeError(f"server error - {data.get('error')}")
+
+        return data
+
+    def health(self) -> Dict:
+        return self.request("/health", verb="GET")
+
+    def scan(self, files: List[str], **kwargs) -> Dict:
+        return self.request("/scan", files=list(files), **kwargs)
+
+    def parse(self, files: List[str], **kwargs) -> Dict:
+        return self.request("/parse", files=list(files), **kwargs)
+
+    def query(self, input: str, **kwargs) -> Dict:
+        return self.request("/query", input=input, **kwargs)
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+"""
+excel parser pipeline statistics
+"""
+
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from time import perf_counter
+from typing import Any, Callable, Dict, Optional
+
+PHASES = ("read", "find", "parse", "serialize", "output")
+
+_AGGREGATE = "*"
+
+
+class Stats:
+    """
+    timers and counters for pipeline phases, per file and in aggregate
+
+    phases are read, find, parse, serialize and output ; counters are
+    files, bytes, tables and cells
+    """
+
+    def __init__(self, callback: Optional[Callable[[str, Dict], None]] = None):
+        self.callback = callback
+        self.times = defaultdict(lambda: defaultdict(float))
+        self.counts = defaultdict(lambda: defaultdict(int))
+        self.notes = defaultdict(lambda: defaultdict(list))
+        self.current = _AGGREGATE
+
+    def start_file(self, f_name: str, size: int = 0):
+        """
+        attribute following phases and counts to f_name
+        """
+
+        self.end_file()
+        self.current = str(f_name)
+        self.count("files")
+        self.count("bytes", size)
+
+    def end_file(self):
+        """
+        close the current file and call the callback with its summary
+        """
+
+        if self.current == _AGGREGATE:
+            return
+
+        f_name = self.current
+        self.current = _AGGREGATE
+
+        if self.callback is not None:
+            self.callback(f_name, self.summary(f_name))
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        time a block of work as the given phase
+        """
+
+        start = perf_counter()
+
+        try:
+            yield
+        finally:
+            elapsed = perf_counter() - start
+            self.times[self.current][name] += elapsed
+
+            if self.current != _AGGREGATE:
+                self.times[_AGGREGATE][name] += elapsed
+
+    def count(self, name: str, n: int = 1):
+        """
+        increment a counter
+        """
+
+        self.counts[self.current][name] += n
+
+        if self.current != _AGGREGATE:
+            self.counts[_AGGREGATE][name] += n
+
+    def note(self, name: str, value: Any):
+        """
+        record a detail about the current file (e.g. sheet shapes)
+        """
+
+        self.notes[self.current][name].append(value)
+
+    def summary(self, f_name: Optional[str] = None) -> Dict:
+        """
+        return times, counts and throughput for a file or the aggregate
+        """
+
+        key = _AGGREGATE if f_name is None else str(f_name)
+        times = dict(self.times[key])
+        counts = dict(self.counts[key])
+        total = sum(times.values())
+
+        def rate(n):
+            return n / total if total else 0.0
+
+        return {
+            "time": times,
+            "total": total,
+            **counts,
+            "cells/s": rate(counts.get("cells", 0)),
+            "tables/s": rate(counts.get("tables", 0)),
+        }
+
+    def format(self, f_name: Optional[str] = None) -> str:
+        """
+        format a summary as one line of text
+        """
+
+        s = self.summary(f_name)
+        phases = " ".join(f"{p} {s['time'][p]:.3f}s" for p in PHASES if p in s["time"])
+
+        return (
+            f"{f_name or 'total'}: {phases} ({s['total']:.3f}s) "
+            f"{s.get('tables', 0)} tables {s.get('cells', 0)} cells "
+            f"{s.get('bytes', 0) / 1_024_000:.2f}MB "
+            f"{s['cells/s']:.0f} cells/s {s['tables/s']:.1f} tables/s"
+        )
+
+
+class NullStats(Stats):
+    """
+    no-op stats used when instrumentation is disabled
+    """
+
+    _null = nullcontext()
+
+    def start_file(self, *args, **kwargs):
+        pass
+
+    def end_file(self):
+        pass
+
+    def phase(self, name: str):
+        return self._null
+
+    def count(self, *args, **kwargs):
+        pass
+
+    def note(self, *args, **kwargs):
+        pass
+
+
+NULL_STATS = NullStats()
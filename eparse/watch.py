@@ -0,0 +1,258 @@
+# -*- coding: utf-8 -*-
+
+"""
+excel parser directory watcher
+
+uses inotify on linux and falls back to polling with os.scandir ; files
+are only reported once their size and mtime have settled so partially
+written files are not parsed
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+from pathlib import Path
+from time import monotonic, sleep
+from typing import Dict, Iterable, Iterator, Optional, Set, Tuple
+
+from .discover import is_workbook_name, list_dir, walk
+
+IN_MODIFY = 0x2
+IN_CLOSE_WRITE = 0x8
+IN_MOVED_TO = 0x80
+IN_CREATE = 0x100
+IN_Q_OVERFLOW = 0x4000
+IN_ISDIR = 0x40000000
+_EVENT = struct.Struct("iIII")
+
+
+def _signature(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+
+    return (st.st_size, st.st_mtime_ns)
+
+
+def _workbooks(paths: Iterable[Path], recursive: bool) -> Iterator[Path]:
+    for f in walk(paths, recursive):
+        if is_workbook_name(f):
+            yield Path(f)
+
+
+class PollSource:
+    """
+    report changed files by comparing scandir snapshots
+    """
+
+    def __init__(self, paths: Iterable[str], recursive: bool = False):
+        self.paths = [Path(p) for p in paths]
+        self.recursive = recursive
+        self.snapshot = self._scan()
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        result = {}
+
+        for p in _workbooks(self.paths, self.recursive):
+            sig = _signature(p)
+
+            if sig is not None:
+                result[p] = sig
+
+        return result
+
+    def rescan(self) -> Set[Path]:
+        """
+        return files changed since the last snapshot and take a new one
+        """
+
+        snapshot = self._scan()
+        changed = {p for p, sig in snapshot.items() if self.snapshot.get(p) != sig}
+        self.snapshot = snapshot
+
+        return changed
+
+    def existing(self) -> Set[Path]:
+        return set(self.snapshot)
+
+    def poll(self, timeout: float) -> Set[Path]:
+        sleep(timeout)
+
+        return self.rescan()
+
+    def close(self):
+        pass
+
+
+class InotifySource(PollSource):
+    """
+    report changed files with linux inotify
+
+    a snapshot is kept as with polling so that when the event queue
+    overflows (and events are lost) changes are found by a rescan
+    """
+
+    mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+    def __init__(self, paths: Iterable[str], recursive: bool = False):
+        self.paths = [Path(p) for p in paths]
+        self.recursive = recursive
+        self.watches = {}
+
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        for p in self.paths:
+            self._add(p)
+
+        self.snapshot = self._scan()
+
+    @classmethod
+    def available(cls) -> bool:
+        return sys.platform.startswith("linux") and bool(ctypes.util.find_library("c"))
+
+    def _add(self, path: Path):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), self.mask)
+
+        if wd < 0:
+            return
+
+        self.watches[wd] = path
+
+        if self.recursive:
+            for d in list_dir(str(path))[1]:
+                self._add(Path(d))
+
+    def overflow(self) -> Set[Path]:
+        """
+        recover from lost events by watching and rescanning the roots
+        """
+
+        for p in self.paths:
+            self._add(p)
+
+        return self.rescan()
+
+    def poll(self, timeout: float) -> Set[Path]:
+        changed = set()
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+
+        if not ready:
+            return changed
+
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+
+        i = 0
+        while i < len(buf):
+            wd, mask, _, length = _EVENT.unpack_from(buf, i)
+            i += _EVENT.size
+            name = os.fsdecode(buf[i : i + length].rstrip(b"\0"))  # noqa: E203
+            i += length
+
+            if mask & IN_Q_OVERFLOW:
+                changed |= self.overflow()
+                continue
+
+            if wd not in self.watches:
+                continue
+
+            path = self.watches[wd] / name
+
+            if mask & IN_ISDIR:
+                if self.recursive and mask & (IN_CREATE | IN_MOVED_TO):
+                    self._add(path)
+                    changed |= set(_workbooks([path], True))
+            elif is_workbook_name(name):
+                changed.add(path)
+
+        # keep the snapshot current so a rescan only reports new changes
+        for p in changed:
+            sig = _signature(p)
+
+            if sig is not None:
+                self.snapshot[p] = sig
+
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class Watcher:
+    """
+    yield new or modified excel files once they have settled
+    """
+
+    def __init__(
+        self,
+        paths: Iterable[str],
+        recursive: bool = False,
+        settle: float = 2.0,
+        interval: float = 1.0,
+        existing: bool = False,
+        inotify: Optional[bool] = None,
+    ):
+        if inotify is None:
+            inotify = InotifySource.available()
+
+        source = InotifySource if inotify else PollSource
+        self.source = source(paths, recursive)
+        self.settle = settle
+        self.interval = interval
+        self.pending = {}
+
+        if existing:
+            self.queue_existing()
+
+    def queue(self, path: Path):
+        """
+        (re)check a file until it settles, as if it had just changed
+        """
+
+        self.pending[path] = (None, monotonic())
+
+    def queue_existing(self):
+        """
+        queue every excel file already in the watched directories
+        """
+
+        for p in self.source.existing():
+            self.queue(p)
+
+    def ready(self) -> Set[Path]:
+        """
+        wait for changes and return files that stopped changing
+        """
+
+        now = monotonic()
+
+        for p in self.source.poll(self.interval):
+            self.pending[p] = (None, now)
+
+        result = set()
+
+        for p, (sig, since) in list(self.pending.items()):
+            current = _signature(p)
+
+            if current is None:
+                del self.pending[p]
+            elif current != sig:
+                self.pending[p] = (current, now)
+            elif now - since >= self.settle:
+                del self.pending[p]
+                result.add(p)
+
+        return result
+
+    def close(self):
+        self.source.close()
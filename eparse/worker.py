@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+"""
+excel parser isolated workers
+
+runs work for a single file in a child process that is killed if it
+exceeds its time or memory budget, so one pathological workbook can't
+stall a crawl
+"""
+
+import multiprocessing
+import os
+from pathlib import Path
+from time import monotonic
+from typing import Callable, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # pragma: no cover
+    resource = None
+
+
+class BudgetExceeded(Exception):
+    """
+    raised when a worker exceeds its time or memory budget
+    """
+
+
+def warm():
+    """
+    worker initializer that pays import costs once
+    """
+
+    import pandas  # noqa: F401
+
+    from . import core, interfaces  # noqa: F401
+
+
+def read_tables(f: Path, *args, **kwargs) -> List[Tuple]:
+    """
+    read all tables from an excel file (runs in a worker process)
+    """
+
+    from .core import get_df_from_file
+
+    return list(get_df_from_file(f, *args, **kwargs))
+
+
+def _context():
+    # fork children from a server that has already imported pandas
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(["eparse.core"])
+        return context
+
+    return multiprocessing.get_context("spawn")
+
+
+def _rss(pid: int) -> Optional[int]:
+    """
+    resident memory of pid in bytes (None where /proc is unavailable)
+    """
+
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _target(conn, fcn, args, kwargs, limit):
+    if limit is not None and resource is not None:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+    try:
+        result = (True, fcn(*args, **kwargs))
+    except MemoryError:
+        result = (False, "exceeded memory budget")
+    except Exception as e:
+        result = (False, f"{type(e).__name__} - {e}")
+
+    conn.send(result)
+    conn.close()
+
+
+def run_isolated(
+    fcn: Callable,
+    *args,
+    timeout: Optional[float] = None,
+    memory: Optional[int] = None,
+    interval: float = 0.05,
+    **kwargs,
+):
+    """
+    return fcn(*args, **kwargs) computed in a child process
+
+    the child is killed and BudgetExceeded raised if it runs longer than
+    timeout seconds or uses more than memory bytes ; other errors in the
+    child are raised as RuntimeError
+    """
+
+    context = _context()
+    conn, child_conn = context.Pipe(duplex=False)
+
+    # measure memory from here where possible, else limit it in the child
+    limit = memory if memory is not None and _rss(os.getpid()) is None else None
+
+    p = context.Process(
+        target=_target,
+        args=(child_conn, fcn, args, kwargs, limit),
+        daemon=True,
+    )
+    p.start()
+    child_conn.close()
+
+    deadline = None if timeout is None else monotonic() + timeout
+
+    try:
+        while not conn.poll(interval):
+            if deadline is not None and monotonic() > deadline:
+                raise BudgetExceeded(f"exceeded {timeout}s time budget")
+
+            if memory is not None and (_rss(p.pid) or 0) > memory:
+                raise BudgetExceeded(f"exceeded {memory / 1e6:.0f}MB memory budget")
+
+        try:
+            ok, result = conn.recv()
+        except EOFError:
+            p.join()
+            raise RuntimeError(f"worker died with exit code {p.exitcode}")
+
+    finally:
+        if p.is_alive():
+            p.kill()
+
+        p.join()
+        conn.close()
+
+    if not ok:
+        if result == "exceeded memory budget":
+            raise BudgetExceeded(result)
+
+        raise RuntimeError(result)
+
+    return result
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+"""
+unit tests for eparse benchmarks
+"""
+
+import pandas as pd
+import pytest
+
+from benchmarks.generate import LAYOUTS, make_sheet, make_workbook, write_workbook
+from benchmarks.run import compare, run
+from eparse.core import _filter_nested_tables, df_find_tables, get_df_from_file
+
+
+def test_make_sheet():
+    for layout in LAYOUTS:
+        a = make_sheet(layout, seed=1)
+        b = make_sheet(layout, seed=1)
+        assert a.equals(b)
+        assert len(df_find_tables(a, True)) >= 1
+    with pytest.raises(ValueError):
+        make_sheet("foo")
+
+
+def test_make_sheet_layouts():
+    assert make_sheet("dense", scale=2).shape == (102, 18)
+    assert make_sheet("wide", scale=2).shape == (8, 802)
+    df = make_sheet("nested")
+    tables = df_find_tables(df, True)
+    assert len(tables) == 2
+    assert len(_filter_nested_tables(tables, df)) == 1
+
+
+def test_write_workbook(tmp_path):
+    path = tmp_path / "bench.xlsx"
+    write_workbook(path, make_workbook(("dense", "many")))
+    sheets = {s for *_, s in get_df_from_file(path)}
+    assert sheets == {"dense", "many"}
+    assert isinstance(pd.read_excel(path, sheet_name=None), dict)
+
+
+def test_run_and_compare():
+    results = run(("dense",), repeat=1)
+    assert {r["benchmark"] for r in results} >= {"df_find_tables", "sqlite_output"}
+    slower = [dict(r, best=r["best"] * 2) for r in results]
+    assert len(compare(results, slower)) == len(results)
+    assert compare(slower, results) == []
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+"""
+unit tests for eparse cache
+"""
+
+from eparse.cache import QueryCache, cache_key
+
+
+def test_cache_key():
+    a = cache_key("db", "get_queryset", {"a": 1, "b": "2"}, 0)
+    b = cache_key("db", "get_queryset", {"b": 2, "a": "1"}, 0)
+    assert a == b
+    assert a != cache_key("db", "get_queryset", {"a": 1, "b": "2"}, 1)
+    assert a != cache_key("db", "get_c_header", {"a": 1, "b": "2"}, 0)
+
+
+def test_query_cache_memory():
+    cache = QueryCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert len(cache) == 2
+
+
+def test_query_cache_disk(tmp_path):
+    cache = QueryCache(path=tmp_path, max_files=2)
+    cache.set("a", [1])
+    assert QueryCache(path=tmp_path).get("a") == [1]
+    cache.set("b", [2])
+    cache.set("c", [3])
+    assert len(list(tmp_path.glob("*.pkl"))) == 2
+    cache.clear()
+    assert QueryCache(path=tmp_path).get("c") is None
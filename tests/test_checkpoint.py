@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""
+unit tests for eparse checkpoint
+"""
+
+import os
+import shutil
+
+from eparse.checkpoint import NULL_CHECKPOINT, Checkpoint
+
+
+def test_checkpoint(tmp_path):
+    f = tmp_path / "a.xlsx"
+    shutil.copy("tests/eparse_unit_test_data.xlsx", f)
+    path = tmp_path / "cp" / "checkpoint.jsonl"
+
+    checkpoint = Checkpoint(path)
+    assert not checkpoint.done(f) and checkpoint.position(f) == 0
+    for i in range(1, 4):
+        checkpoint.mark(f, i)
+    checkpoint.close()
+
+    # a torn write at the end of the file is ignored
+    with open(path, "a") as fp:
+        fp.write('{"file": ')
+
+    checkpoint = Checkpoint(path)
+    assert checkpoint.position(f) == 3
+    assert len(path.read_text().splitlines()) == 1
+    checkpoint.mark(f, 3, done=True)
+    checkpoint.close()
+
+    assert Checkpoint(path).done(f)
+    assert not Checkpoint(path, resume=False).done(f)
+
+    # changed files are processed again
+    checkpoint = Checkpoint(path)
+    checkpoint.mark(f, 3, done=True)
+    os.utime(f, ns=(0, 0))
+    assert not checkpoint.done(f)
+
+
+def test_checkpoint_sync(tmp_path, monkeypatch):
+    f = tmp_path / "a.xlsx"
+    shutil.copy("tests/eparse_unit_test_data.xlsx", f)
+    path = tmp_path / "checkpoint.jsonl"
+    checkpoint = Checkpoint(path, sync_every=10, sync_interval=3600)
+    syncs = []
+    monkeypatch.setattr(os, "fsync", syncs.append)
+    for i in range(1, 26):
+        checkpoint.mark(f, i)
+    assert len(syncs) == 2
+    checkpoint.mark(f, 26, done=True)
+    assert len(syncs) == 3
+    checkpoint.close()
+    assert len(syncs) == 3
+    assert Checkpoint(path).position(f) == 26
+
+
+def test_null_checkpoint(tmp_path):
+    NULL_CHECKPOINT.mark(tmp_path, 1, done=True)
+    NULL_CHECKPOINT.sync()
+    assert not NULL_CHECKPOINT.done(tmp_path)
+    assert NULL_CHECKPOINT.position(tmp_path) == 0
@@ -4,6 +4,12 @@
 unit tests for eparse cli
 """
 
+import json
+import shutil
+import subprocess
+import sys
+import zipfile
+
 import pytest
 from click.testing import CliRunner
 
@@ -19,6 +25,22 @@ def test_main():
     assert "Usage" in result.output
 
 
+def test_lazy_imports():
+    code = (
+        "import sys; from eparse.cli import main; "
+        "main(['--help'], obj={}, standalone_mode=False); "
+        "print(*[m for m in ('pandas', 'openpyxl', 'peewee') if m in sys.modules])"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert "Usage" in result.stdout
+    assert result.stdout.splitlines()[-1] == ""
+
+
 def test_scan():
     runner = CliRunner()
     result = runner.invoke(main, ["-f", "tests/", "scan"], **kwargs)
@@ -26,6 +48,29 @@ def test_scan():
     assert "eparse_unit_test_data" in result.output
 
 
+def test_scan_exclude():
+    runner = CliRunner()
+    result = runner.invoke(
+        main, ["-v", "-f", "tests/", "--exclude", "*nested*", "scan"], **kwargs
+    )
+    assert result.exit_code == 0
+    assert "eparse_unit_test_data" in result.output
+    assert "eparse_nested_test_data" not in result.output
+    assert "found 1 files" in result.output
+
+
+def test_scan_rejects(tmp_path):
+    shutil.copy("tests/eparse_unit_test_data.xlsx", tmp_path)
+    (tmp_path / "~$eparse_unit_test_data.xlsx").write_bytes(b"\x08user")
+    (tmp_path / "export.xlsx").write_text("a,b\n1,2\n")
+    runner = CliRunner()
+    result = runner.invoke(main, ["-f", str(tmp_path), "scan"], **kwargs)
+    assert result.exit_code == 0
+    assert "eparse_unit_test_data.xlsx" in result.output
+    assert "export.xlsx - no zip or ole2 signature" in result.output
+    assert "~$eparse_unit_test_data.xlsx - office lock file" in result.output
+
+
 def test_parse():
     runner = CliRunner()
     result = runner.invoke(
@@ -35,22 +80,214 @@ def test_parse():
     assert "eparse_unit_test_data" in result.output
 
 
-def test_query():
+def test_parse_stats():
     runner = CliRunner()
-    result = runner.invoke(main, ["-i", "sqlite3:///tests/test.db", "query"], **kwargs)
+    result = runner.invoke(main, ["--stats", "-f", "tests/", "parse", "-z"], **kwargs)
     assert result.exit_code == 0
-    assert result.output == ""
+    assert "eparse_unit_test_data.xlsx: read" in result.output
+    assert "total: read" in result.output
+
+
+def test_parse_stats_same_name(tmp_path):
+    for d in ("a", "b"):
+        (tmp_path / d).mkdir()
+        shutil.copy("tests/eparse_unit_test_data.xlsx", tmp_path / d)
+    runner = CliRunner()
+    args = ["--stats", "-f", str(tmp_path), "-r", "parse", "-z"]
+    result = runner.invoke(main, args, **kwargs)
+    assert result.exit_code == 0
+    for d in ("a", "b"):
+        f = tmp_path / d / "eparse_unit_test_data.xlsx"
+        line = next(x for x in result.output.splitlines() if x.startswith(f"{f}:"))
+        assert " 10 tables " in line
+
+
+def test_profile(tmp_path):
+    runner = CliRunner()
+    for cmd in (["scan", "-s", "TEST", "-t"], ["parse"]):
+        args = ["-f", "tests/eparse_unit_test_data.xlsx"] + cmd
+        result = runner.invoke(main, args + ["--profile", str(tmp_path)], **kwargs)
+        assert result.exit_code == 0
+        assert "TEST (113, 11) 10 candidates" in result.output
+        assert (tmp_path / "slowest.json").exists()
+
+
+def test_parse_jsonl():
+    runner = CliRunner()
+    result = runner.invoke(
+        main,
+        ["-f", "tests/eparse_unit_test_data.xlsx", "-o", "jsonl:///", "parse", "-z"],
+        **kwargs,
+    )
+    assert result.exit_code == 0
+    lines = result.stdout.splitlines()
+    assert "eparse_unit_test_data.xlsx" in result.stderr
+    assert json.loads(lines[0])["f_name"] == "eparse_unit_test_data.xlsx"
+
+
+def test_parse_jsonl_errors(tmp_path):
+    bad = tmp_path / "bad.xlsx"
+    with zipfile.ZipFile(bad, "w") as z:
+        z.writestr("[Content_Types].xml", "<Types/>")
+        z.writestr("xl/workbook.xml", "not a workbook")
+    runner = CliRunner()
+    args = ["-f", str(bad), "-f", "tests/eparse_unit_test_data.xlsx", "-o", "jsonl:///"]
+    result = runner.invoke(main, args + ["parse", "-z"], **kwargs)
+    assert result.exit_code == 0
+    assert all(json.loads(line) for line in result.stdout.splitlines())
+    assert "skipping" in result.stderr
+
+
+def test_parse_replace(tmp_path):
+    runner = CliRunner()
+    db = f"sqlite3:///{tmp_path / 'test.db'}"
+    args = ["-f", "tests/eparse_unit_test_data.xlsx", "-o", db, "parse", "-z"]
+    runner.invoke(main, args, **kwargs)
+    result = runner.invoke(main, ["-i", db, "dedupe"], **kwargs)
+    assert "removed 0 duplicate rows" in result.output
+    for replace in ("file", "table"):
+        result = runner.invoke(main, args + ["--replace", replace], **kwargs)
+        assert result.exit_code == 0
+    runner.invoke(main, args, **kwargs)
+    result = runner.invoke(main, ["-i", db, "dedupe"], **kwargs)
+    assert result.exit_code == 0
+    assert "removed 0 duplicate rows" not in result.output
 
 
-def test_migrate():
+def test_parse_replace_same_name(tmp_path):
+    for d in ("a", "b"):
+        (tmp_path / d).mkdir()
+        shutil.copy("tests/eparse_unit_test_data.xlsx", tmp_path / d)
+    runner = CliRunner()
+    db = f"sqlite3:///{tmp_path / 'test.db'}"
+    args = ["-f", str(tmp_path / "a"), "-o", db, "parse", "-z"]
+    for replace in ([], ["--replace", "file"]):
+        result = runner.invoke(main, args + replace, **kwargs)
+        assert result.exit_code == 0
+    count = ["-i", db, "-o", "jsonl:///", "query", "-m", "get_f_name"]
+    result = runner.invoke(main, count, **kwargs)
+    rows = json.loads(result.stdout)["Total Rows"]
+    runner.invoke(main, ["-f", str(tmp_path / "b"), "-o", db, "parse", "-z"], **kwargs)
+    for replace in ("file", "table"):
+        result = runner.invoke(main, args + ["--replace", replace], **kwargs)
+        assert "is stored under the same name" in result.output
+    result = runner.invoke(main, count, **kwargs)
+    assert json.loads(result.stdout)["Total Rows"] == 2 * rows
+
+
+def test_parse_dedupe_tables(tmp_path):
+    for name in ("a.xlsx", "b.xlsx"):
+        shutil.copy("tests/eparse_unit_test_data.xlsx", tmp_path / name)
+    db = f"sqlite3:///{tmp_path / 'test.db'}"
+    args = ["-f", str(tmp_path), "-o", db, "parse", "-z", "--dedupe-tables"]
+    runner = CliRunner()
+    result = runner.invoke(main, args + ["--replace", "file"], **kwargs)
+    assert result.exit_code == 0
+    query = ["-i", db, "-o", "jsonl:///", "query", "-m"]
+    result = runner.invoke(main, query + ["get_tables"], **kwargs)
+    tables = [json.loads(line) for line in result.stdout.splitlines()]
+    assert len(tables) == 20
+    stored = {t["f_name"] for t in tables if t["stored"]}
+    assert stored in ({"a.xlsx"}, {"b.xlsx"})
+    cells = []
+    for f_name in ("a.xlsx", "b.xlsx"):
+        args = query + ["get_cells", "-f", "f_name", f_name]
+        result = runner.invoke(main, args, **kwargs)
+        cells.append(len(result.stdout.splitlines()))
+    assert cells[0] == cells[1] > 0
+
+
+def test_parse_resume(tmp_path):
+    from eparse.checkpoint import Checkpoint
+
+    f = tmp_path / "eparse_unit_test_data.xlsx"
+    shutil.copy("tests/eparse_unit_test_data.xlsx", f)
+    cp = str(tmp_path / "checkpoint.jsonl")
+    args = ["-f", str(f), "-o", "jsonl:///", "parse", "-z", "--checkpoint", cp]
+
+    # simulate a run that died after outputting 4 tables
+    checkpoint = Checkpoint(cp, resume=False)
+    checkpoint.mark(f, 4)
+    checkpoint.close()
+
+    runner = CliRunner()
+    result = runner.invoke(main, args + ["--resume"], **kwargs)
+    assert result.exit_code == 0
+    tables = {json.loads(line)["name"] for line in result.stdout.splitlines()}
+    assert len(tables) == 6
+
+    result = runner.invoke(main, ["-v"] + args + ["--resume"], **kwargs)
+    assert result.exit_code == 0
+    assert result.stdout == ""
+    assert "already parsed" in result.stderr
+
+    result = runner.invoke(main, args, **kwargs)
+    tables = {json.loads(line)["name"] for line in result.stdout.splitlines()}
+    assert len(tables) == 10
+
+
+def test_parse_budget(tmp_path):
+    cp = str(tmp_path / "checkpoint.jsonl")
+    args = ["-f", "tests/eparse_unit_test_data.xlsx", "-o", "jsonl:///", "parse"]
+    runner = CliRunner()
+
+    result = runner.invoke(main, args + ["-z", "--timeout", "60"], **kwargs)
+    assert result.exit_code == 0
+    assert json.loads(result.stdout.splitlines()[0])["f_name"]
+
+    result = runner.invoke(
+        main, args + ["--timeout", "0.001", "--checkpoint", cp], **kwargs
+    )
+    assert result.exit_code == 0
+    assert "time budget" in result.stderr
+    with open(cp) as f:
+        assert "time budget" in json.loads(f.readline())["skipped"]
+
+
+def test_watch(tmp_path):
+    shutil.copy("tests/eparse_unit_test_data.xlsx", tmp_path)
     runner = CliRunner()
     result = runner.invoke(
         main,
-        ["-i", "sqlite3:///tests/test.db", "migrate", "-m", "migration_000102_000200"],
+        ["-f", str(tmp_path), "-o", "jsonl:///", "watch", "-z", "--existing"]
+        + ["--settle", "0", "--interval", "0.1", "--duration", "1"],
         **kwargs,
     )
+    assert result.exit_code == 0
+    assert "watching" in result.stderr
+    assert json.loads(result.stdout.splitlines()[0])["f_name"].startswith("eparse")
+
+
+def test_query():
+    runner = CliRunner()
+    result = runner.invoke(main, ["-i", "sqlite3:///tests/test.db", "query"], **kwargs)
+    assert result.exit_code == 0
+    assert result.output == ""
+
+
+def test_query_cache(tmp_path):
+    runner = CliRunner()
+    args = ["-i", "sqlite3:///tests/test.db", "query", "-c", str(tmp_path)]
+    for _ in range(2):
+        result = runner.invoke(main, args, **kwargs)
+        assert result.exit_code == 0
+    assert len(list(tmp_path.glob("*.pkl"))) == 1
+
+
+def test_migrate(tmp_path):
+    db = tmp_path / "test.db"
+    shutil.copy("tests/test.db", db)
+    runner = CliRunner()
+    args = ["-i", f"sqlite3:///{db}", "migrate", "-m", "migration_000102_000200"]
+    result = runner.invoke(main, args, **kwargs)
+    assert result.exit_code == 0
+    assert "applied migration_000102_000200" in result.output
+    result = runner.invoke(main, args, **kwargs)
+    assert result.exit_code == 0
+    assert "migration_000102_000200 already applied" in result.output
+    result = runner.invoke(main, args[:-1] + ["foo"], **kwargs)
     assert result.exit_code == 1
-    assert "duplicate column name: timestamp" in result.output
+    assert "there is no foo" in result.output
 
 
 def test_outputs():
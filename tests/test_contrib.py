@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+"""
+unit tests for eparse contrib modules
+"""
+
+import pytest
+
+pytest.importorskip("unstructured")
+xlsx = pytest.importorskip("eparse.contrib.unstructured.xlsx")
+partition = pytest.importorskip("eparse.contrib.unstructured.partition")
+
+
+def test_iter_partition_xlsx_chunks():
+    filename = "tests/eparse_unit_test_data.xlsx"
+    whole = list(xlsx.iter_partition_xlsx(filename=filename, eparse_mode="eparse"))
+    chunked = xlsx.iter_partition_xlsx(
+        filename=filename, eparse_mode="eparse", eparse_chunk_rows=2
+    )
+    elements = []
+    for element in chunked:
+        locator = element.metadata.data_source.record_locator
+        # column labels, the header row and at most 2 body rows
+        assert element.metadata.text_as_html.count("<tr") <= 4
+        elements.append(locator)
+    assert len(elements) > len(whole)
+    assert any(locator["chunk"] > 0 for locator in elements)
+
+
+def test_partition_chunks_in_unstructured_mode():
+    filename = "tests/eparse_unit_test_data.xlsx"
+    whole = partition.partition(filename=filename, eparse_mode="unstructured")
+    chunked = partition.partition(
+        filename=filename, eparse_mode="unstructured", eparse_chunk_rows=2
+    )
+    assert len(chunked) > len(whole)
@@ -4,14 +4,25 @@
 unit tests for eparse core
 """
 
+import numpy as np
 import pandas as pd
 
 from eparse.core import (
+    CellRecord,
+    NaIndex,
+    TableRef,
+    df_extract_tables,
+    df_fingerprint,
     df_find_tables,
     df_parse_table,
+    df_row_windows,
+    df_serialize_records,
     df_serialize_table,
     get_df_from_file,
+    get_df_digest,
     get_table_digest,
+    html_table_rows,
+    html_table_to_df,
     html_to_df,
     html_to_serialized_data,
     _get_table_bounds,
@@ -33,6 +44,20 @@ def test_df_find_tables_loose(xlsx):
     assert (102, 2, "C103", "Schedule of Principal Repayments:") in t
 
 
+def test_df_find_tables_block_size(xlsx, xlss_nested):
+    sparse = pd.DataFrame(index=range(150), columns=range(40), dtype=object)
+    sparse.iloc[10:20, 5:9] = 1.0
+    sparse.iloc[130:133, 30:40] = "x"
+
+    for df in (xlsx, xlss_nested, sparse):
+        for loose in (True, False):
+            expected = df_find_tables(df, loose, block_size=None)
+            for block_size in (1, 5, 64):
+                assert df_find_tables(df, loose, block_size) == expected
+
+    assert [t[:2] for t in df_find_tables(sparse, True)] == [(10, 5), (130, 30)]
+
+
 def test_df_parse_table(xlsx):
     t = df_parse_table(xlsx, 102, 2)
     assert t.shape == (11, 8)
@@ -53,6 +78,30 @@ def test_df_parse_table_na_tolerance(xlsx):
     assert t.shape == (9, 8)
 
 
+def test_df_parse_table_na_index(xlsx, xlss_nested):
+    for df in (xlsx, xlss_nested):
+        index = NaIndex(df)
+        for r, c, *_ in df_find_tables(df, loose=True):
+            for tolerance in (1, 2, 3):
+                expected = df_parse_table(df, r, c, tolerance, tolerance)
+                t = df_parse_table(df, r, c, tolerance, tolerance, na_index=index)
+                assert t.index.equals(expected.index)
+                assert t.columns.equals(expected.columns)
+
+
+def test_df_extract_tables(xlsx):
+    index = NaIndex(xlsx)
+    tables = df_find_tables(xlsx, loose=True)
+    views = df_extract_tables(index, tables, 2, 2)
+    assert len(views) == len(tables) == 10
+    for view, (r, c, excel_RC, name) in zip(views, tables):
+        expected = df_parse_table(xlsx, r, c, 2, 2)
+        assert (view.excel_RC, view.name) == (excel_RC, name)
+        assert view.shape == expected.shape
+        pd.testing.assert_frame_equal(view.to_df(), expected)
+        assert np.shares_memory(view.values, index.values)
+
+
 def test_df_parse_nested_subtables():
     tables = list(
         get_df_from_file("tests/eparse_nested_test_data.xlsx", exclude_nested=False)
@@ -107,6 +156,51 @@ def test_df_serialize_table(xlsx):
     assert t[22]["c_header"] == "Date"
 
 
+def test_df_serialize_records(xlsx):
+    t = df_parse_table(xlsx, 102, 2)
+    records = df_serialize_records(t, name="n", f_name="f")
+    expected = df_serialize_table(t, name="n", f_name="f")
+    assert all(isinstance(r, CellRecord) for r in records)
+    assert [dict(r) for r in records] == expected
+    assert list(records[22]) == list(expected[22])
+    assert "sheet" not in records[22] and records[22].get("sheet") is None
+    assert not hasattr(records[22], "__dict__")
+
+
+def test_table_ref(xlsx):
+    ref = df_find_tables(xlsx)[0]
+    assert isinstance(ref, TableRef)
+    assert ref == (2, 2, "C3", "ID")
+    assert ref._asdict()["excel_RC"] == ref.excel_RC == "C3"
+
+
+def test_df_fingerprint(xlsx):
+    t = df_parse_table(xlsx, 102, 2)
+    moved = t.copy()
+    moved.index += 5
+    moved.columns += 3
+    assert df_fingerprint(moved) == df_fingerprint(t)
+    assert len(df_fingerprint(t)) == 64
+    moved.iloc[1, 1] = "changed"
+    assert df_fingerprint(moved) != df_fingerprint(t)
+    assert df_fingerprint(t.iloc[:-1]) != df_fingerprint(t)
+    ints = pd.DataFrame([[1, "a"], ["b", 2]], dtype=object)
+    strs = pd.DataFrame([["1", "a"], ["b", "2"]], dtype=object)
+    assert df_fingerprint(ints) != df_fingerprint(strs)
+
+
+def test_df_row_windows():
+    df = pd.DataFrame({"a": ["h", 1, 2, 3, 4, 5], "b": ["H", 6, 7, 8, 9, 10]})
+    df.index += 10
+    assert next(df_row_windows(df)) is df
+    assert next(df_row_windows(df, 5)) is df
+    windows = list(df_row_windows(df, 2))
+    assert [len(w) for w in windows] == [3, 3, 2]
+    assert all(w.iloc[0].tolist() == ["h", "H"] for w in windows)
+    assert [w.index.tolist() for w in windows] == [[10, 11, 12], [10, 13, 14], [10, 15]]
+    assert pd.concat([w.iloc[1:] for w in windows]).equals(df.iloc[1:])
+
+
 def test_get_df_from_file():
     filename = "tests/eparse_unit_test_data.xlsx"
     df_a, *_ = next(get_df_from_file(filename))
@@ -129,6 +223,60 @@ def test_get_table_digest(xlsx):
     assert "float" in digest
 
 
+def test_get_df_digest(xlsx):
+    for r, c in ((26, 1), (102, 2)):
+        parse = df_parse_table(xlsx, r, c)
+        serialized = df_serialize_table(parse)
+        columnar = {k: [d[k] for d in serialized] for k in serialized[0]}
+        expected = get_table_digest(serialized, "T", "f.xlsx", "S")
+        assert get_df_digest(parse, "T", "f.xlsx", "S") == expected
+        assert get_table_digest(columnar, "T", "f.xlsx", "S") == expected
+
+
+def test_get_df_digest_max_headers(xlsx):
+    parse = df_parse_table(xlsx, 102, 2)
+    digest = get_df_digest(parse, "T", max_headers=2)
+    assert f"{parse.shape[0]} row(s) having names like Date, 44834, ... " in digest
+    assert f"{parse.shape[1]} column(s)" in digest
+    serialized = df_serialize_table(parse)
+    assert "44834, ... " in get_table_digest(serialized, "T", max_headers=2)
+    assert get_df_digest(parse, "T", max_type_rows=1) != get_df_digest(parse, "T")
+
+
+def test_get_df_digest_types():
+    df = pd.DataFrame(
+        {
+            0: ["a", "b", "c"],
+            1: pd.to_datetime([None, "2024-01-01", None]),
+            2: [1, 2, 3],
+            3: [1.5, None, 2.5],
+        }
+    )
+    expected = get_table_digest(df_serialize_table(df), "T")
+    assert get_df_digest(df, "T") == expected
+    assert "Timestamp" in expected and "NaTType" in expected
+
+
+def test_get_df_digest_dtypes():
+    columns = {
+        "datetime": pd.to_datetime(["2020-01-01", None, "2020-01-03"]),
+        "int": pd.array([1, None, 3], dtype="Int64"),
+        "float": [1.5, None, 2.5],
+        "bool": [True, False, True],
+        "str": pd.array(["a", None, "c"], dtype="string"),
+        "object": ["a", 2, None],
+    }
+    for first in columns:
+        df = pd.DataFrame({first: columns[first], **columns})
+        df.columns = range(df.shape[1])
+        for t in (df, df.T.reset_index(drop=True)):
+            expected = get_table_digest(df_serialize_table(t), "T")
+            assert get_df_digest(t, "T") == expected
+    df = pd.DataFrame({0: columns["int"], 1: columns["datetime"]})
+    digest = get_df_digest(df, "T")
+    assert "2020-01-01 00:00:00" in digest and "<NA>" in digest
+
+
 def test_html_to_df_and_serialized_data(xlsx):
     table = df_parse_table(xlsx, 102, 2)
     html = table.to_html(index=False, header=False, na_rep="")
@@ -139,3 +287,44 @@ def test_html_to_df_and_serialized_data(xlsx):
     assert isinstance(st, list)
     assert isinstance(st[0], dict)
     assert len(st) == 11 * 8
+
+
+def test_html_table_rows():
+    html = (
+        "<table><tr><th rowspan=2>a</th><th colspan=2>b</th></tr>"
+        "<tr><td>c</td><td><table><tr><td>x</td></tr></table></td></tr>"
+        "<tr><td> d  e </td><td></td><td>f</td></tr></table>"
+        "<table><tr><td>g</td></tr></table>"
+    )
+    assert list(html_table_rows(html)) == [
+        ["a", "b", "b"],
+        ["a", "c", "x"],
+        ["d e", "", "f"],
+    ]
+    assert list(html_table_rows(html, 1)) == [["x"]]
+    assert list(html_table_rows(html, 2)) == [["g"]]
+    assert list(html_table_rows(html, 3)) == []
+
+
+def test_html_table_to_df(xlsx):
+    table = df_parse_table(xlsx, 102, 2)
+    html = table.to_html(index=False, header=False, na_rep="")
+    html += "<table><tr><td>other</td></tr></table>"
+    df = html_table_to_df(html)
+    pd.testing.assert_frame_equal(df, html_to_df(html)[0])
+    assert html_to_serialized_data(html, name="t") == df_serialize_table(df, name="t")
+
+
+def test_html_ragged_numeric_table():
+    html = (
+        "<table><tr><td>a</td></tr>"
+        "<tr><td>NaN</td><td>3</td><td>x</td></tr>"
+        "<tr><td>b</td><td>4.5</td></tr></table>"
+    )
+    df = html_table_to_df(html)
+    pd.testing.assert_frame_equal(df, html_to_df(html)[0])
+    st = html_to_serialized_data(html, name="t")
+    assert st == df_serialize_table(html_to_df(html)[0], name="t")
+    assert len(st) == 9
+    assert st[4]["value"] == "3.0" and "float" in st[4]["type"]
+    assert st[3]["value"] == "nan"
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+"""
+unit tests for eparse discover
+"""
+
+import shutil
+from zipfile import ZipFile
+
+import pytest
+
+from eparse.discover import (
+    OLE2_SIGNATURE,
+    Discovery,
+    is_workbook_name,
+    sniff,
+    walk,
+)
+
+SOURCE = "tests/eparse_unit_test_data.xlsx"
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """
+    directory tree with workbooks, a fake workbook and other files
+    """
+
+    (tmp_path / "sub" / "deep").mkdir(parents=True)
+    (tmp_path / "archive").mkdir()
+
+    for f in ("a.xlsx", "sub/b.XLSX", "sub/deep/c.xlsm", "archive/d.xlsx"):
+        shutil.copy(SOURCE, tmp_path / f)
+
+    (tmp_path / "fake.xlsx").write_text("a,b\n1,2\n")
+    (tmp_path / "notes.txt").write_text("notes")
+
+    return tmp_path
+
+
+def test_sniff(tree):
+    assert sniff(str(tree / "a.xlsx")) is None
+    assert sniff(str(tree / "fake.xlsx")) == "no zip or ole2 signature"
+    assert sniff(str(tree / "missing.xlsx")).startswith("unreadable")
+
+    (tree / "~$a.xlsx").write_bytes(b"\x08user")
+    assert sniff(str(tree / "~$a.xlsx")) == "office lock file"
+
+    (tree / "empty.xls").write_bytes(b"")
+    assert sniff(str(tree / "empty.xls")) == "empty file"
+
+    (tree / "old.xls").write_bytes(OLE2_SIGNATURE + bytes(504))
+    assert sniff(str(tree / "old.xls")) is None
+
+    (tree / "broken.xlsx").write_bytes(b"PK\x03\x04" + bytes(100))
+    assert sniff(str(tree / "broken.xlsx")).startswith("corrupt zip file")
+
+    with ZipFile(tree / "other.xlsx", "w") as z:
+        z.writestr("[Content_Types].xml", "<Types/>")
+        z.writestr("word/document.xml", "<document/>")
+    assert sniff(str(tree / "other.xlsx")) == "zip file without a workbook part"
+
+    with ZipFile(tree / "plain.xlsx", "w") as z:
+        z.writestr("xl/workbook.xml", "<workbook/>")
+    assert sniff(str(tree / "plain.xlsx")) == "zip file without [Content_Types].xml"
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_discovery(tree, workers):
+    rejected = []
+    files = Discovery(
+        [tree],
+        recursive=True,
+        workers=workers,
+        on_reject=lambda f, reason: rejected.append((f.name, reason)),
+    )
+    names = sorted(f.name for f in files)
+    assert names == ["a.xlsx", "b.XLSX", "c.xlsm", "d.xlsx"]
+    assert files.found == 4
+    assert rejected == [("fake.xlsx", "no zip or ole2 signature")]
+
+    files = Discovery([tree], workers=workers, magic=False)
+    assert sorted(f.name for f in files) == ["a.xlsx", "fake.xlsx"]
+
+
+def test_discovery_globs(tree):
+    files = Discovery([tree], recursive=True, exclude=["archive", "a.*"])
+    assert sorted(f.name for f in files) == ["b.XLSX", "c.xlsm"]
+
+    files = Discovery([tree, tree / "a.xlsx"], recursive=True, include=["*/sub/*"])
+    assert sorted(f.name for f in files) == ["b.XLSX", "c.xlsm"]
+
+
+def test_discovery_lazy(tree):
+    files = iter(Discovery([tree], recursive=True, workers=4))
+    assert next(files).suffix.lower() in (".xlsx", ".xlsm")
+    files.close()
+
+
+def test_walk(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "a.xlsx").touch()
+    (tmp_path / "sub" / "b.xlsx").touch()
+    assert list(walk([tmp_path])) == [str(tmp_path / "a.xlsx")]
+    assert len(list(walk([tmp_path], recursive=True))) == 2
+    assert list(walk([tmp_path], recursive=True, exclude=["sub"])) == [
+        str(tmp_path / "a.xlsx")
+    ]
+    assert is_workbook_name("dir/data.XLSM")
+    assert not is_workbook_name("dir/~$data.xlsx")
@@ -4,14 +4,23 @@
 unit tests for eparse interfaces
 """
 
+import json
+from time import perf_counter
+
 import pandas as pd
 from peewee import SqliteDatabase
 
+from eparse.cache import QueryCache
 from eparse.interfaces import (
     DATABASE,
     BaseInterface,
+    CsvInterface,
     ExcelParse,
+    ExcelParseCell,
+    ExcelParseMeta,
+    ExcelParseTable,
     HtmlInterface,
+    JsonlInterface,
     NullInterface,
     Sqlite3Interface,
     StdoutInterface,
@@ -93,3 +102,201 @@ def test_parse_uri():
     assert all([k in p.keys() for k in (keys + not_keys)])
     assert all([k in p.values() for k in keys])
     assert all([k not in p.values() for k in not_keys])
+
+
+def test_query_cache(data, ctx, tmp_path):
+    obj = i_factory(f"sqlite3:///{tmp_path / 'test.db'}", ExcelParse)
+    obj.cache = QueryCache()
+    obj.output([data], ctx)
+    version = obj.data_version
+    assert version == 1
+    assert len(obj.input("get_queryset")) == 1
+    ExcelParse.create(**data)
+    assert len(obj.input("get_queryset")) == 1
+    ExcelParseMeta.bump("data_version")
+    assert obj.data_version == version + 1
+    assert len(obj.input("get_queryset")) == 2
+
+
+def test_query_cache_database_id(data, ctx, tmp_path, monkeypatch):
+    cache = QueryCache()
+
+    def query(uri, f_name=None):
+        obj = i_factory(uri, ExcelParse)
+        obj.cache = cache
+        if f_name is not None:
+            obj.output([dict(data, f_name=f_name)], ctx)
+        return list(obj.input("get_queryset")["f_name"])
+
+    path = tmp_path / "x.db"
+    assert query(f"sqlite3:///{path}", "a.xlsx") == ["a.xlsx"]
+    path.unlink()
+    assert query(f"sqlite3:///{path}", "c.xlsx") == ["c.xlsx"]
+
+    for d, f_name in (("a", "a.xlsx"), ("b", "b.xlsx")):
+        (tmp_path / d).mkdir()
+        monkeypatch.chdir(tmp_path / d)
+        assert query("sqlite3:///x.db", f_name) == [f_name]
+        assert query("sqlite3:///x.db") == [f_name]
+
+
+def test_jsonl_interface(data, capsys, tmp_path):
+    obj = i_factory("jsonl:///")
+    assert isinstance(obj, JsonlInterface)
+    obj.output([data, data])
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 2
+    assert json.loads(lines[0]) == data
+    obj.output(pd.DataFrame([{"a": 1, "b": float("nan")}]))
+    assert json.loads(capsys.readouterr().out) == {"a": 1, "b": None}
+    path = tmp_path / "out.jsonl"
+    i_factory(f"jsonl:///{path}").output([data])
+    assert json.loads(path.read_text()) == data
+
+
+def test_csv_interface(data, capsys):
+    obj = i_factory("csv:///")
+    assert isinstance(obj, CsvInterface)
+    obj.output([data])
+    obj.output([data])
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 3
+    assert lines[0] == ",".join(data.keys())
+
+
+def test_cell_records(data, ctx, capsys, tmp_path):
+    from eparse.core import CellRecord
+
+    record = CellRecord(**data)
+    for uri in ("jsonl:///", "csv:///"):
+        i_factory(uri).output([data])
+        expected = capsys.readouterr().out
+        i_factory(uri).output([record])
+        assert capsys.readouterr().out == expected
+    obj = i_factory(f"sqlite3:///{tmp_path / 'test.db'}", ExcelParse)
+    obj.output([record], ctx)
+    assert len(obj.input("get_queryset", f_name=data["f_name"])) == 1
+
+
+def test_dedupe_tables(data, ctx, tmp_path):
+    obj = i_factory(f"sqlite3:///{tmp_path / 'test.db'}", ExcelParse)
+    table = [data, dict(data, row=1, value="x")]
+    other = [dict(d, f_name="other") for d in table]
+    obj.output(table + other, ctx, fingerprints=["a", "a"])
+    obj.output([dict(data, name="b")], ctx, fingerprints=["b"])
+    assert len(ExcelParseCell.select()) == 3
+    assert len(ExcelParse.select()) == 0
+    assert len(obj.input("get_tables")) == 3
+    assert len(obj.input("get_cells", f_name="other")) == 2
+    obj.replace = "file"
+    obj.output([dict(data, name="b")], ctx, fingerprints=["b"])
+    assert len(ExcelParseTable.select()) == 2
+    cells = obj.input("get_cells", f_name="other")
+    assert list(cells["value"]) == ["test", "x"]
+    f_names = set(ExcelParseCell.select(ExcelParseCell.f_name).tuples())
+    assert f_names == {("other",), ("test",)}
+
+
+def test_dedupe_same_name_tables(data, ctx, tmp_path):
+    obj = i_factory(f"sqlite3:///{tmp_path / 'test.db'}", ExcelParse)
+    first = [data, dict(data, row=1, excel_RC="A2", value="x")]
+    second = [dict(d, excel_RC="C" + d["excel_RC"][1:], value="y") for d in first]
+    obj.output(first + second, ctx, fingerprints=["a", "b"])
+    cells = obj.input("get_cells", f_name="test")
+    assert len(cells) == 4
+    assert list(cells["value"]) == ["test", "x", "y", "y"]
+    assert list(cells["fingerprint"]) == ["a", "a", "b", "b"]
+
+
+def test_dedupe_moved_tables(data, ctx, tmp_path):
+    obj = i_factory(f"sqlite3:///{tmp_path / 'test.db'}", ExcelParse)
+    table = [
+        dict(data, excel_RC="B2"),
+        dict(data, column=1, excel_RC="C2"),
+        dict(data, row=1, excel_RC="B3"),
+    ]
+    moved = [
+        dict(d, f_name="other", excel_RC=rc) for d, rc in zip(table, ("F5", "G5", "F6"))
+    ]
+    obj.output(table + moved, ctx, fingerprints=["a", "a"])
+    assert list(obj.input("get_cells", f_name="test")["excel_RC"]) == ["B2", "C2", "B3"]
+    assert list(obj.input("get_cells", f_name="other")["excel_RC"]) == [
+        "F5",
+        "G5",
+        "F6",
+    ]
+    obj.output(moved, ctx, fingerprints=["a"])
+    obj.replace = "file"
+    obj.output([dict(data, name="b")], ctx, fingerprints=["b"])
+    assert (
+        list(obj.input("get_cells", f_name="other")["excel_RC"])
+        == ["F5", "G5", "F6"] * 2
+    )
+    assert "origin" not in obj.input("get_cells")
+
+
+def test_replace_and_dedupe(data, ctx, tmp_path):
+    obj = i_factory(f"sqlite3:///{tmp_path / 'test.db'}", ExcelParse)
+    other = dict(data, name="other", row=1)
+    obj.output([data, other], ctx)
+    obj.output([data, other], ctx)
+    assert len(ExcelParse.select()) == 4
+    obj.replace = "table"
+    obj.output([data], ctx)
+    assert len(ExcelParse.select()) == 3
+    obj.replace = "file"
+    obj.output([data], ctx)
+    assert len(ExcelParse.select()) == 1
+    obj.replace = None
+    obj.output([data, other, other], ctx)
+    obj.batch_size = 1
+    assert obj.dedupe() == 2
+    assert len(ExcelParse.select()) == 2
+    assert obj.dedupe() == 0
+    obj.output([dict(data, excel_RC="X1")], ctx)
+    assert obj.dedupe() == 0
+    assert len(ExcelParse.select()) == 3
+
+
+def test_dedupe_scales_linearly(data, ctx, tmp_path):
+    def timed(n):
+        obj = i_factory(f"sqlite3:///{tmp_path / f'dedupe{n}.db'}", ExcelParse)
+        cells = [dict(data, row=r, column=c) for r in range(n // 10) for c in range(10)]
+        obj.output(cells, ctx)
+        obj.output(cells, ctx)
+        start = perf_counter()
+        assert obj.dedupe() == n
+        elapsed = perf_counter() - start
+        assert len(ExcelParse.select()) == n
+        return elapsed
+
+    small, large = timed(2_000), timed(8_000)
+    assert large < 8 * max(small, 0.05)
+
+
+def test_replace_same_name_tables(data, ctx, tmp_path):
+    obj = i_factory(f"sqlite3:///{tmp_path / 'test.db'}", ExcelParse)
+    obj.replace = "table"
+    first = [data, dict(data, row=1)]
+    second = [dict(d, excel_RC=f"X{d['row'] + 1}") for d in first]
+    for _ in range(2):
+        obj.start_file()
+        obj.output(first, ctx)
+        obj.output(second, ctx)
+        assert len(ExcelParse.select()) == 4
+
+
+def test_html_interface_memory(data):
+    df = pd.DataFrame.from_records([data, data])
+    html = df.to_html(index=False, header=False)
+    meta = {"name": "t", "f_name": "f.html"}
+    obj = i_factory("html:///", ExcelParse, html=html, memory=True, meta=meta)
+    assert obj.memory
+    assert obj.df.shape == (2, 10)
+    assert len(obj.input("get_queryset")) == 20
+    assert len(obj.input("get_queryset", f_name="f.html")) == 20
+    other = i_factory("html:///:memory:", ExcelParse, html=html, store=False)
+    assert other.memory and other.name != obj.name
+    assert other.df.shape == (2, 10)
+    other.initialize(DATABASE)
+    assert not DATABASE.table_exists("excelparse")
@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+"""
+unit tests for eparse migrations
+"""
+
+from peewee import PostgresqlDatabase, SqliteDatabase
+
+from eparse.interfaces import DATABASE, ExcelParse, ExcelParseMigration
+from eparse.migrations import (
+    Migration,
+    add_not_null,
+    backfill,
+    migration_000102_000200,
+)
+
+
+def _legacy_db(path, data, n=5):
+    """
+    create a 0.1.2 style database without timestamps or indexes
+    """
+
+    db = SqliteDatabase(path)
+    fields = ", ".join(f'"{k}"' for k in data)
+    db.execute_sql(
+        f'CREATE TABLE "excelparse" ("id" INTEGER NOT NULL PRIMARY KEY, {fields})'
+    )
+    for _ in range(n):
+        db.execute_sql(
+            f'INSERT INTO "excelparse" ({fields}) VALUES ({", ".join("?" * len(data))})',
+            tuple(data.values()),
+        )
+    db.close()
+
+
+def test_migration_000102_000200(data, tmp_path):
+    path = tmp_path / "legacy.db"
+    _legacy_db(path, data)
+    DATABASE.initialize(SqliteDatabase(path))
+    DATABASE.connect()
+
+    progress = []
+    assert migration_000102_000200(ExcelParse, lambda *p: progress.append(p))
+    assert ("migration_000102_000200", 10, 10) in progress
+    assert ExcelParse.select().where(ExcelParse.timestamp.is_null()).count() == 0
+    indexes = [i.name for i in DATABASE.get_indexes("excelparse")]
+    assert "excelparse_f_name_sheet_name" in indexes
+    assert migration_000102_000200(ExcelParse) is False
+
+
+def test_migration_resume(data, tmp_path):
+    path = tmp_path / "legacy.db"
+    _legacy_db(path, data)
+    DATABASE.initialize(SqliteDatabase(path))
+    DATABASE.connect()
+
+    def fail(*args):
+        raise RuntimeError("interrupted")
+
+    steps = migration_000102_000200.steps[:1]
+    m = Migration("test", steps + [fail])
+    try:
+        m(ExcelParse)
+    except RuntimeError:
+        pass
+    assert ExcelParseMigration.get(name="test").step == 1
+
+    m.steps = steps + [backfill("excelparse", "timestamp", lambda: "x", 2)]
+    assert m(ExcelParse)
+    assert ExcelParse.select().where(ExcelParse.timestamp.is_null()).count() == 0
+
+
+def test_add_not_null_postgres():
+    class Recorder(PostgresqlDatabase):
+        sql = []
+
+        def execute_sql(self, sql, params=None, *args, **kwargs):
+            self.sql.append(sql)
+
+            class Cursor:
+                def fetchone(self):
+                    return None
+
+            return Cursor()
+
+    db = Recorder("test")
+    add_not_null("excelparse", "timestamp")(ExcelParse, db)
+    alters = [s for s in db.sql if s.startswith("ALTER")]
+    assert "CHECK" in alters[0] and alters[0].endswith("NOT VALID")
+    assert "VALIDATE CONSTRAINT" in alters[1]
+    assert alters[2].endswith("SET NOT NULL")
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+
+"""
+unit tests for eparse profiler
+"""
+
+import json
+
+from eparse.core import get_df_from_file
+from eparse.profiler import NULL_PROFILER, Profiler
+from eparse.stats import Stats
+
+
+def test_profiler(tmp_path):
+    stats = Stats()
+    profiler = Profiler(tmp_path, top=1, stats=stats)
+    for f in ("tests/eparse_unit_test_data.xlsx", "tests/eparse_nested_test_data.xlsx"):
+        with profiler.profile(f):
+            stats.start_file(f)
+            list(get_df_from_file(f, stats=stats))
+    assert len(list(tmp_path.glob("*.prof"))) == 2
+    slowest = profiler.slowest()
+    assert len(slowest) == 1
+    assert slowest[0]["sheets"][0]["candidates"] > 0
+    assert [s["sheet"] for s in profiler.results[1]["sheets"]] == ["Sheet"]
+    report = json.loads(profiler.write_report().read_text())
+    assert report == slowest
+
+
+def test_null_profiler():
+    with NULL_PROFILER.profile("foo"):
+        pass
+    assert NULL_PROFILER.slowest() == []
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+"""
+unit tests for eparse server
+"""
+
+import threading
+
+import pytest
+
+from eparse.server import Client, get_interface, make_server, parse
+
+
+@pytest.fixture(params=["http", "unix"])
+def client(request, tmp_path):
+    """
+    running server and client fixture
+    """
+
+    if request.param == "http":
+        server = make_server("http://127.0.0.1:0", workers=1)
+        address = f"http://127.0.0.1:{server.server_address[1]}"
+    else:
+        address = f"unix://{tmp_path / 'eparse.sock'}"
+        server = make_server(address, workers=1)
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield Client(address, timeout=60)
+
+    server.shutdown()
+    server.server_close()
+    server.executor.shutdown()
+
+
+def test_server(client, tmp_path):
+    assert client.health()["status"] == "ok"
+
+    result = client.scan(["tests/"], tables=True)
+    files = {f["file"]: f for f in result["files"]}
+    assert files["tests/eparse_unit_test_data.xlsx"]["tables"]["TEST"] == 10
+
+    db = f"sqlite3:///{tmp_path / 'test.db'}"
+    result = client.parse(
+        ["tests/eparse_unit_test_data.xlsx"], output=db, serialize=True
+    )
+    assert len(result["files"][0]["tables"]) == 10
+
+    records = client.query(db, filters={"name": "ID"})["records"]
+    assert records and all(r["name"] == "ID" for r in records)
+
+    with pytest.raises(RuntimeError):
+        client.request("/foo")
+    with pytest.raises(RuntimeError):
+        client.query(db, method="foo")
+
+
+def test_parse(tmp_path):
+    db = f"sqlite3:///{tmp_path / 'test.db'}"
+    f = "tests/eparse_unit_test_data.xlsx"
+    kwargs = {
+        "output": db,
+        "serialize": True,
+        "dedupe_tables": True,
+        "checkpoint": str(tmp_path / "checkpoint.jsonl"),
+    }
+
+    result = parse([f], include_data=True, stats=True, **kwargs)["files"][0]
+    assert len(result["tables"]) == 10
+    assert result["stats"]["tables"] == 10
+    assert isinstance(result["tables"][0]["data"][0], dict)
+    assert len(get_interface(db).input("get_tables")) == 10
+
+    assert parse([f], resume=True, **kwargs)["files"][0]["done"]
+    assert "done" not in parse([f], **kwargs)["files"][0]
+    assert len(get_interface(db).input("get_tables")) == 20
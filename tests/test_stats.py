@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+"""
+unit tests for eparse stats
+"""
+
+from eparse.core import get_df_from_file
+from eparse.stats import NULL_STATS, Stats
+
+
+def test_stats():
+    files = []
+    stats = Stats(callback=lambda f, s: files.append((f, s)))
+    stats.start_file("a.xlsx", 100)
+    with stats.phase("read"):
+        pass
+    stats.count("cells", 4)
+    stats.start_file("b.xlsx", 50)
+    stats.count("cells", 2)
+    stats.end_file()
+    assert [f for f, _ in files] == ["a.xlsx", "b.xlsx"]
+    assert files[0][1]["cells"] == 4
+    assert "read" in files[0][1]["time"]
+    total = stats.summary()
+    assert total["files"] == 2
+    assert total["bytes"] == 150
+    assert total["cells"] == 6
+    assert stats.format().startswith("total: read")
+
+
+def test_null_stats():
+    with NULL_STATS.phase("read"):
+        NULL_STATS.count("cells")
+    assert NULL_STATS.summary()["total"] == 0
+
+
+def test_get_df_from_file_stats():
+    stats = Stats()
+    tables = list(get_df_from_file("tests/eparse_unit_test_data.xlsx", stats=stats))
+    s = stats.summary()
+    assert s["tables"] == len(tables)
+    assert s["cells"] == sum(t.size for t, *_ in tables)
+    assert all(p in s["time"] for p in ("read", "find", "parse"))
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+"""
+unit tests for eparse watch
+"""
+
+import shutil
+import threading
+import time
+
+import pytest
+
+from eparse.watch import InotifySource, Watcher, is_workbook_name
+from eparse.worker import read_tables
+
+SOURCE = "tests/eparse_unit_test_data.xlsx"
+
+
+def test_is_workbook_name():
+    assert is_workbook_name("data.xlsx")
+    assert is_workbook_name("DATA.XLS")
+    assert not is_workbook_name("~$data.xlsx")
+    assert not is_workbook_name("data.csv")
+
+
+@pytest.mark.parametrize(
+    "inotify",
+    [
+        False,
+        pytest.param(
+            True,
+            marks=pytest.mark.skipif(
+                not InotifySource.available(),
+                reason="inotify not available",
+            ),
+        ),
+    ],
+)
+def test_watcher(tmp_path, inotify):
+    shutil.copy(SOURCE, tmp_path / "old.xlsx")
+    watcher = Watcher([tmp_path], settle=0.2, interval=0.05, inotify=inotify)
+
+    (tmp_path / "new.xlsx").write_bytes(b"partial")
+    (tmp_path / "notes.txt").write_text("ignored")
+    (tmp_path / "~$new.xlsx").write_bytes(b"lock")
+
+    def finish_writing():
+        time.sleep(0.1)
+        shutil.copy(SOURCE, tmp_path / "new.xlsx")
+
+    thread = threading.Thread(target=finish_writing)
+    thread.start()
+
+    ready = set()
+    deadline = time.monotonic() + 5
+    while not ready and time.monotonic() < deadline:
+        ready |= watcher.ready()
+
+    thread.join()
+    watcher.close()
+
+    assert ready == {tmp_path / "new.xlsx"}
+    assert read_tables(tmp_path / "new.xlsx", True)
+
+
+def test_watcher_existing(tmp_path):
+    shutil.copy(SOURCE, tmp_path / "old.xlsx")
+    watcher = Watcher([tmp_path], settle=0, interval=0, existing=True, inotify=False)
+    ready = watcher.ready() | watcher.ready()
+    watcher.close()
+    assert ready == {tmp_path / "old.xlsx"}
+
+
+def test_watcher_queue(tmp_path):
+    shutil.copy(SOURCE, tmp_path / "old.xlsx")
+    watcher = Watcher([tmp_path], settle=0, interval=0, inotify=False)
+    assert watcher.ready() == set()
+    watcher.queue_existing()
+    ready = watcher.ready() | watcher.ready()
+    assert ready == {tmp_path / "old.xlsx"}
+    watcher.queue(tmp_path / "old.xlsx")
+    ready = watcher.ready() | watcher.ready()
+    watcher.close()
+    assert ready == {tmp_path / "old.xlsx"}
+
+
+@pytest.mark.skipif(not InotifySource.available(), reason="inotify not available")
+def test_inotify_overflow(tmp_path):
+    (tmp_path / "sub").mkdir()
+    shutil.copy(SOURCE, tmp_path / "old.xlsx")
+    source = InotifySource([tmp_path], recursive=True)
+    assert source.overflow() == set()
+    shutil.copy(SOURCE, tmp_path / "sub" / "new.xlsx")
+    assert source.overflow() == {tmp_path / "sub" / "new.xlsx"}
+    assert source.overflow() == set()
+    source.close()
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+"""
+unit tests for eparse worker
+"""
+
+import time
+
+import pytest
+
+from eparse.worker import BudgetExceeded, read_tables, run_isolated
+
+
+def hog(n):
+    data = b"x" * n
+    time.sleep(30)
+    return len(data)
+
+
+def test_run_isolated():
+    tables = run_isolated(read_tables, "tests/eparse_unit_test_data.xlsx", True)
+    assert len(tables) == 10
+
+    with pytest.raises(RuntimeError, match="ValueError"):
+        run_isolated(int, "x")
+
+
+def test_run_isolated_budget():
+    start = time.monotonic()
+    with pytest.raises(BudgetExceeded, match="time budget"):
+        run_isolated(time.sleep, 30, timeout=0.5)
+    assert time.monotonic() - start < 10
+
+    with pytest.raises(BudgetExceeded, match="memory budget"):
+        run_isolated(hog, 500_000_000, memory=400_000_000, timeout=30)